@@ -0,0 +1,144 @@
+"""
+Benchmark and error check of the quantized lookup tables and the diagnosis cache.
+
+Checks that lookup-table memberships stay within quantization_error_bound of the exact
+ones, for analytic and sampled fuzzy sets: at the worst-case readings (grid midpoints and
+either side of them, the universe edges and just outside, every triangle breakpoint), on a
+hand-made partition with zero-width triangle sides (where the bound is capped at 1) and
+at random readings. Also checks that CachedDiagnoser firing strengths stay within its
+max_error of diagnose. Then times diagnose against
+CachedDiagnoser on a stream of readings drawn from a small pool of distinct readings,
+like idle engines repeating the same values, and reports the hit rate.
+Exits with status 1 if an error exceeds its bound.
+
+Usage:
+    python -m benchmarks.bench_cache [--levels 1024] [--readings 20000] [--distinct 500]
+"""
+import argparse
+import sys
+import time
+import numpy as np
+from benchmarks.synthetic import LABEL_COLUMN, make_dataset, sensor_names
+from fuzzy.inference_engine import diagnose
+from fuzzy.lookup import CachedDiagnoser, build_lookup_tables, lookup_memberships, quantization_error_bound
+from fuzzy.membership import memberships, to_sampled, universe_bounds
+from fuzzy.partition import auto_partition
+from fuzzy.rule_compiler import compile_rules
+from fuzzy.rule_generator import generate_rules
+
+
+# Partition with zero-width triangle sides inside the universe: 'mid' rises from 0 to 1 at
+# 4 and drops back at 6, so its quantization error is only bounded by the cap of 1
+ZERO_WIDTH_SETS = {'bounds': (0.0, 10.0), 'trimf': {'low': (0.0, 0.0, 4.0), 'mid': (4.0, 4.0, 6.0),
+                                                    'peak': (6.0, 6.0, 6.0), 'high': (6.0, 10.0, 10.0)}}
+
+
+def _random_values(entry, sensor_sets, rng, n_values=100_000):
+    # random readings, including some outside the universe
+    lo, hi = entry['bounds']
+    return rng.uniform(lo - 0.05 * (hi - lo), hi + 0.05 * (hi - lo), n_values)
+
+
+def _worst_case_values(entry, sensor_sets):
+    # readings where snapping moves furthest or an MF jumps: grid points and midpoints with
+    # their neighbouring floats, the universe edges and just beyond, and MF breakpoints
+    lo, hi = entry['bounds']
+    grid = lo + entry['step'] * np.arange(len(entry['table']) + 1)
+    points = np.concatenate([grid, grid + entry['step'] / 2, [lo, hi]])
+    if 'trimf' in sensor_sets:
+        points = np.concatenate([points, np.ravel(list(sensor_sets['trimf'].values()))])
+    else:
+        points = np.concatenate([points, sensor_sets['universe']])
+    return np.unique(np.concatenate([points, np.nextafter(points, -np.inf), np.nextafter(points, np.inf)]))
+
+
+def _check_tables(fuzzy_sets, steps, values_for):
+    # worst membership error over the readings values_for(entry, sensor_sets) gives
+    failures = 0
+    for sensor, entry in build_lookup_tables(fuzzy_sets, steps).items():
+        values = values_for(entry, fuzzy_sets[sensor])
+        error = np.abs(lookup_memberships(entry, values) - memberships(fuzzy_sets[sensor], entry['names'], values)).max()
+        ok = error <= entry['max_error'] + 1e-12
+        failures += not ok
+        print(f"  {sensor:>10} max error {error:.2e}  bound {entry['max_error']:.2e}  {'ok' if ok else 'FAIL'}")
+    return failures
+
+
+def check_worst_cases(fuzzy_sets, steps):
+    """
+    Deterministic check of the lookup-table error bound; returns the number of failures.
+
+    Covers fuzzy_sets and ZERO_WIDTH_SETS, each in both representations, at
+    _worst_case_values. The analytic ZERO_WIDTH_SETS must also get the capped bound of 1.
+    """
+    zero_width = {'zero_width': ZERO_WIDTH_SETS}
+    failures = 0
+    for name, sets, sensor_steps in (('analytic', fuzzy_sets, steps),
+                                     ('sampled', {s: to_sampled(fs) for s, fs in fuzzy_sets.items()}, steps),
+                                     ('zero-width sides, analytic', zero_width, 0.3),
+                                     ('zero-width sides, sampled', {'zero_width': to_sampled(ZERO_WIDTH_SETS)}, 0.3)):
+        print(f"membership error, {name}, worst cases:")
+        failures += _check_tables(sets, sensor_steps, _worst_case_values)
+    capped = quantization_error_bound(ZERO_WIDTH_SETS, 0.3) == 1.0
+    failures += not capped
+    print(f"  zero-width sides bound capped at 1  {'ok' if capped else 'FAIL'}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50_000, help="training rows")
+    parser.add_argument('--sensors', type=int, default=8)
+    parser.add_argument('--levels', type=int, default=1024, help="quantization levels per sensor range")
+    parser.add_argument('--readings', type=int, default=20_000)
+    parser.add_argument('--distinct', type=int, default=500, help="distinct readings in the stream")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    sensors = sensor_names(args.sensors)
+    df = make_dataset(args.rows, n_sensors=args.sensors)
+    fuzzy_sets = {s: auto_partition(df[s], method='histogram') for s in sensors}
+    steps = {s: (universe_bounds(fuzzy_sets[s])[1] - universe_bounds(fuzzy_sets[s])[0]) / args.levels
+             for s in sensors}
+    rules = generate_rules(df, fuzzy_sets, label_column=LABEL_COLUMN, sensors=sensors)
+    compiled = compile_rules(rules, fuzzy_sets)
+
+    failures = check_worst_cases(fuzzy_sets, steps)
+    for name, sets in (('analytic', fuzzy_sets), ('sampled', {s: to_sampled(fs) for s, fs in fuzzy_sets.items()})):
+        print(f"membership error, {name}, random readings:")
+        failures += _check_tables(sets, steps, lambda entry, sensor_sets: _random_values(entry, sensor_sets, rng))
+
+    # a stream of readings repeating a pool of distinct readings
+    pool = df[sensors].sample(args.distinct, random_state=0).to_dict(orient='records')
+    stream = [pool[i] for i in rng.integers(0, len(pool), args.readings)]
+
+    cached = CachedDiagnoser(fuzzy_sets, compiled, steps)
+    worst = 0.0
+    for reading in pool:
+        exact = diagnose(reading, fuzzy_sets, compiled)['activated_rule_info']
+        approx = cached.diagnose(reading)['activated_rule_info']
+        if exact is not None and approx is not None:
+            # the strongest rule's strength is within max_error even when the winner differs
+            worst = max(worst, abs(exact['firing_strength'] - approx['firing_strength']))
+    ok = worst <= cached.max_error + 1e-12
+    failures += not ok
+    print(f"firing strength max error {worst:.2e}  bound {cached.max_error:.2e}  {'ok' if ok else 'FAIL'}")
+    cached.clear()
+
+    start = time.perf_counter()
+    for reading in stream:
+        diagnose(reading, fuzzy_sets, compiled)
+    exact_us = (time.perf_counter() - start) / len(stream) * 1e6
+    start = time.perf_counter()
+    for reading in stream:
+        cached.diagnose(reading)
+    cached_us = (time.perf_counter() - start) / len(stream) * 1e6
+    stats = cached.stats()
+    print(f"diagnose {exact_us:.1f} us/reading, cached {cached_us:.1f} us/reading "
+          f"({exact_us / cached_us:.1f}x), hit rate {stats['hit_rate']:.1%}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark of the auto_partition clustering backends.
+
+Times auto_partition with method='kmeans' (scikit-learn), 'exact' and 'histogram' on
+synthetic sensor data and reports the speedup over KMeans, plus how far each backend's
+within-cluster sum of squares is from the exact optimum.
+
+Usage:
+    python -m benchmarks.bench_partition [--sizes 100000 1000000] [--num-sets 3] [--repeat 3]
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from fuzzy.partition import auto_partition
+
+
+def _synthetic_sensor(n_rows, seed=0):
+    # mixture of operating regimes, like a sensor switching between idle/cruise/load
+    rng = np.random.default_rng(seed)
+    regime = rng.integers(0, 3, n_rows)
+    return pd.Series(rng.normal(np.array([800.0, 2200.0, 3400.0])[regime], np.array([120.0, 300.0, 250.0])[regime]))
+
+
+def _sse(values, fuzzy_sets):
+    # within-cluster sum of squares of the partition peaks (the cluster centers)
+    centers = np.array([abc[1] for abc in fuzzy_sets['trimf'].values()])
+    nearest = np.abs(values[:, None] - centers[None, :]).argmin(axis=1)
+    return float(((values - centers[nearest]) ** 2).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--num-sets', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'method':>10} {'best s':>9} {'speedup':>8} {'SSE / exact':>12}")
+    for n_rows in args.sizes:
+        series = _synthetic_sensor(n_rows)
+        values = series.to_numpy()
+        timings, sse = {}, {}
+        for method in ('kmeans', 'exact', 'histogram'):
+            best = np.inf
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                fuzzy_sets = auto_partition(series, num_sets=args.num_sets, method=method)
+                best = min(best, time.perf_counter() - start)
+            timings[method] = best
+            sse[method] = _sse(values, fuzzy_sets)
+        for method in timings:
+            print(f"{n_rows:>10} {method:>10} {timings[method]:>9.4f} "
+                  f"{timings['kmeans'] / timings[method]:>7.1f}x {sse[method] / sse['exact']:>12.6f}")
+
+
+if __name__ == '__main__':
+    main()
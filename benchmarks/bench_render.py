@@ -0,0 +1,71 @@
+"""
+Benchmark of headless batch rendering of rule-activation plots.
+
+Renders the activation plot of a batch of diagnosed readings to files three ways: one
+new pyplot figure per reading (plot_input_membership_for_rule_antecedent with show=False
+and savefig), a single reused ActivationRenderer, and render_activation_reports on a
+process pool. Reports plots per second for each.
+
+Usage:
+    python -m benchmarks.bench_render [--readings 200] [--workers 4] [--format png]
+"""
+import argparse
+import os
+import tempfile
+import time
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from benchmarks.synthetic import LABEL_COLUMN, make_dataset, sensor_names
+from fuzzy.inference_engine import diagnose
+from fuzzy.partition import auto_partition
+from fuzzy.report import ActivationRenderer, render_activation_reports
+from fuzzy.rule_compiler import compile_rules
+from fuzzy.rule_generator import generate_rules
+from fuzzy.visualization import plot_input_membership_for_rule_antecedent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20_000, help="training rows")
+    parser.add_argument('--sensors', type=int, default=6)
+    parser.add_argument('--readings', type=int, default=200, help="plots rendered per method")
+    parser.add_argument('--naive-readings', type=int, default=30, help="plots rendered with new figures")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--format', choices=('png', 'svg'), default='png')
+    args = parser.parse_args()
+
+    sensors = sensor_names(args.sensors)
+    df = make_dataset(args.rows, n_sensors=args.sensors)
+    fuzzy_sets = {s: auto_partition(df[s], method='histogram') for s in sensors}
+    compiled = compile_rules(generate_rules(df, fuzzy_sets, label_column=LABEL_COLUMN, sensors=sensors), fuzzy_sets)
+    readings = df[sensors].sample(args.readings, random_state=0).to_dict(orient='records')
+    items = [(reading, diagnose(reading, fuzzy_sets, compiled, threshold=0.0)['activated_rule_info'])
+             for reading in readings]
+
+    with tempfile.TemporaryDirectory() as out:
+        naive = items[:args.naive_readings]
+        start = time.perf_counter()
+        for i, (reading, rule_info) in enumerate(naive):
+            fig = plot_input_membership_for_rule_antecedent(reading, fuzzy_sets, rule_info, show=False)
+            fig.savefig(os.path.join(out, f'naive_{i}.{args.format}'), dpi=80)
+            plt.close(fig)
+        naive_rate = len(naive) / (time.perf_counter() - start)
+        print(f"new figure per plot   {naive_rate:7.1f} plots/s")
+
+        start = time.perf_counter()
+        renderer = ActivationRenderer(fuzzy_sets, sensors)
+        for i, (reading, rule_info) in enumerate(items):
+            renderer.render(reading, rule_info, os.path.join(out, f'reused_{i}.{args.format}'))
+        renderer.close()
+        reused_rate = len(items) / (time.perf_counter() - start)
+        print(f"reused renderer       {reused_rate:7.1f} plots/s ({reused_rate / naive_rate:.1f}x)")
+
+        result = render_activation_reports(items, fuzzy_sets, os.path.join(out, 'pool'), sensors=sensors,
+                                           fmt=args.format, n_workers=args.workers)
+        print(f"{f'{args.workers} worker(s)':<22}{result['plots_per_second']:7.1f} plots/s "
+              f"({result['plots_per_second'] / naive_rate:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
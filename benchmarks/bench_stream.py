@@ -0,0 +1,64 @@
+"""
+Throughput and batch-size check of stream_diagnose.
+
+Replays the engine CSV as several interleaved engines and diagnoses it once per
+--batch-sizes value. Every run must give the same rows as batch_size=1: the same fault
+states, top consequents and smoothed strengths, bit for bit. Exits with status 1 if any
+row differs. Also reports rows per second for each batch size.
+
+Usage:
+    python -m benchmarks.bench_stream [--csv data/engine_failure_detection.csv] [--engines 3]
+"""
+import argparse
+import sys
+import time
+import numpy as np
+import pandas as pd
+from fuzzy.partition import auto_partition
+from fuzzy.rule_compiler import compile_rules
+from fuzzy.rule_generator import generate_rules
+from fuzzy.streaming import stream_diagnose
+
+
+def _run(df, fuzzy_sets, compiled, sensors, batch_size, args):
+    start = time.perf_counter()
+    rows = [(o['fault'], o['fault_strength'], o['top_consequent'], o['top_strength'])
+            for o in stream_diagnose(df, fuzzy_sets, compiled, sensors=sensors, engine_column='engine',
+                                     window=args.window, threshold=args.threshold, max_gap=args.max_gap,
+                                     batch_size=batch_size)]
+    return rows, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--csv', default='data/engine_failure_detection.csv')
+    parser.add_argument('--label-column', default='Fault_Condition')
+    parser.add_argument('--engines', type=int, default=3, help="engines the rows are dealt out to")
+    parser.add_argument('--window', type=int, default=4)
+    parser.add_argument('--threshold', type=float, default=0.2)
+    parser.add_argument('--max-gap', type=float, default=600.0, help="seconds")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[2, 7, 64, 1024])
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)
+    sensors = [c for c in df.columns if c != args.label_column and pd.api.types.is_float_dtype(df[c])]
+    fuzzy_sets = {s: auto_partition(df[s], method='histogram') for s in sensors}
+    compiled = compile_rules(generate_rules(df, fuzzy_sets, label_column=args.label_column, sensors=sensors),
+                             fuzzy_sets)
+    df['engine'] = np.arange(len(df)) % args.engines
+
+    reference, seconds = _run(df, fuzzy_sets, compiled, sensors, 1, args)
+    print(f"batch_size {1:>6}: {len(df) / seconds:>9.0f} rows/s")
+    failures = 0
+    for batch_size in args.batch_sizes:
+        rows, seconds = _run(df, fuzzy_sets, compiled, sensors, batch_size, args)
+        differing = sum(a != b for a, b in zip(reference, rows))
+        failures += differing > 0
+        print(f"batch_size {batch_size:>6}: {len(df) / seconds:>9.0f} rows/s, "
+              f"{differing} rows differ from batch_size 1  {'ok' if not differing else 'FAIL'}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Import footprint of the inference-only path.
+
+Trains a small model, saves it, then in a fresh interpreter imports `fuzzy`, loads the
+model and runs one diagnose. Reports the import/load time and the top-level modules that
+got imported. Exits with status 1 if any training or plotting dependency was loaded, or
+if the import took longer than --max-import-ms (best of --repeat fresh interpreters).
+
+Usage:
+    python -m benchmarks.import_footprint [--csv data/engine_failure_detection.csv] [--max-import-ms 100]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# Libraries the scoring path must not import
+FORBIDDEN_MODULES = ('pandas', 'sklearn', 'skfuzzy', 'scipy', 'matplotlib')
+# Default limit on importing the scoring path: about three times the NumPy-only import on
+# a typical machine. pandas adds about 100 ms and scikit-learn several hundred
+DEFAULT_MAX_IMPORT_MS = 100.0
+
+_SCORING_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from fuzzy import load_model, diagnose
+imported = time.perf_counter()
+fuzzy_sets, compiled = load_model(sys.argv[1], sensors=json.loads(sys.argv[2]))
+loaded = time.perf_counter()
+diagnose(json.loads(sys.argv[3]), fuzzy_sets, compiled)
+done = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1e3,
+    'load_ms': (loaded - imported) * 1e3,
+    'first_diagnose_ms': (done - loaded) * 1e3,
+    'modules': sorted({name.split('.')[0] for name in sys.modules}),
+}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--csv', default='data/engine_failure_detection.csv')
+    parser.add_argument('--label-column', default='Fault_Condition')
+    parser.add_argument('--max-import-ms', type=float, default=DEFAULT_MAX_IMPORT_MS,
+                        help="fail if importing the scoring path takes longer")
+    parser.add_argument('--repeat', type=int, default=3, help="fresh interpreters to run; the fastest counts")
+    args = parser.parse_args()
+
+    import pandas as pd
+    from fuzzy.partition import auto_partition
+    from fuzzy.rule_generator import generate_rules
+    from fuzzy.model_io import save_model
+
+    df = pd.read_csv(args.csv)
+    sensors = [c for c in df.columns if c != args.label_column and pd.api.types.is_float_dtype(df[c])]
+    fuzzy_sets = {s: auto_partition(df[s], method='histogram') for s in sensors}
+    rules = generate_rules(df, fuzzy_sets, label_column=args.label_column, sensors=sensors)
+    reading = {s: float(df[s].iloc[0]) for s in sensors}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, 'model.fzm')
+        save_model(model_path, fuzzy_sets, rules)
+        reports = []
+        for _ in range(max(1, args.repeat)):
+            result = subprocess.run([sys.executable, '-c', _SCORING_SCRIPT, model_path, json.dumps(sensors),
+                                     json.dumps(reading)], capture_output=True, text=True, check=True,
+                                    cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            reports.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    report = min(reports, key=lambda r: r['import_ms'])
+    forbidden = sorted(set().union(*(r['modules'] for r in reports)) & set(FORBIDDEN_MODULES))
+
+    print(f"import fuzzy + names: {report['import_ms']:.1f} ms")
+    print(f"load_model:           {report['load_ms']:.2f} ms")
+    print(f"first diagnose:       {report['first_diagnose_ms']:.2f} ms")
+    print(f"top-level modules:    {len(report['modules'])}")
+    failed = False
+    if forbidden:
+        print(f"FAIL: scoring path imported {forbidden}")
+        failed = True
+    else:
+        print("OK: no training or plotting dependencies imported")
+    if report['import_ms'] > args.max_import_ms:
+        print(f"FAIL: import took {report['import_ms']:.1f} ms, limit {args.max_import_ms:.0f} ms")
+        failed = True
+    else:
+        print(f"OK: import within {args.max_import_ms:.0f} ms")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
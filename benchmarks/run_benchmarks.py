@@ -0,0 +1,220 @@
+"""
+Benchmark suite for partitioning, rule induction and inference on synthetic workloads.
+
+For every combination of --rows, --sensors, --sets and --faults it times auto_partition,
+generate_rules, single-reading diagnose latency (p50/p95/p99, with the rule list and with a
+compiled rule base) and diagnose_batch throughput, and measures the peak traced memory of
+each stage. Results are written as JSON. With --compare, the results are checked against
+a saved baseline and the run exits with status 1 if any metric regressed by more than
+--tolerance.
+
+With --memory-check, diagnose_batch is also run on a workload with thousands of rules
+(200,000 rows and 8 sensors by default, about 5,000 rules), and the run exits with status 1
+if its peak traced memory exceeds BATCH_MEMORY_BYTES plus the per-row inputs and results.
+
+Usage:
+    python -m benchmarks.run_benchmarks --rows 10000 100000 --output results.json
+    python -m benchmarks.run_benchmarks --rows 10000 100000 --compare baseline.json
+    python -m benchmarks.run_benchmarks --rows 10000 --memory-check
+"""
+import argparse
+import itertools
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+from benchmarks.synthetic import LABEL_COLUMN, make_dataset, make_readings, sensor_names
+from fuzzy.inference_engine import BATCH_MEMORY_BYTES, diagnose, diagnose_batch
+from fuzzy.partition import auto_partition
+from fuzzy.rule_compiler import compile_rules
+from fuzzy.rule_generator import generate_rules
+
+# Metrics where a larger value is better; every other metric is a time or memory cost
+HIGHER_IS_BETTER = ('rows_per_second',)
+
+
+def _timed(func, *args, repeat=1, **kwargs):
+    # best-of-repeat wall time, and the last result
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _peak_memory(func, *args, **kwargs):
+    # peak bytes allocated (NumPy and Python objects) while func runs
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _latencies(readings, fuzzy_sets, rules):
+    times = np.empty(len(readings))
+    for i, reading in enumerate(readings):
+        start = time.perf_counter()
+        diagnose(reading, fuzzy_sets, rules)
+        times[i] = time.perf_counter() - start
+    p50, p95, p99 = np.percentile(times, [50, 95, 99]) * 1e6
+    return {'p50_us': p50, 'p95_us': p95, 'p99_us': p99}
+
+
+def run_workload(n_rows, n_sensors, n_sets, n_faults, n_readings=1000, repeat=3, method='kmeans'):
+    """
+    Benchmarks one workload.
+
+    Returns:
+        dict: Stage name -> metric name -> value.
+    """
+    df = make_dataset(n_rows, n_sensors=n_sensors, n_faults=n_faults)
+    sensors = sensor_names(n_sensors)
+    results = {}
+
+    def partition_all():
+        return {s: auto_partition(df[s], num_sets=n_sets, method=method) for s in sensors}
+
+    seconds, fuzzy_sets = _timed(partition_all, repeat=repeat)
+    results['auto_partition'] = {'seconds': seconds, 'peak_bytes': _peak_memory(partition_all)}
+
+    seconds, rules = _timed(generate_rules, df, fuzzy_sets, label_column=LABEL_COLUMN, sensors=sensors,
+                            repeat=repeat)
+    results['generate_rules'] = {
+        'seconds': seconds,
+        'rows_per_second': n_rows / seconds,
+        'peak_bytes': _peak_memory(generate_rules, df, fuzzy_sets, label_column=LABEL_COLUMN, sensors=sensors),
+        'n_rules': len(rules),
+    }
+
+    compiled = compile_rules(rules, fuzzy_sets)
+    readings = make_readings(df, n_sensors, n_readings)
+    # the rule-list scan is O(rules) per reading, so it gets a smaller sample
+    results['diagnose'] = _latencies(readings[:max(1, n_readings // 10)], fuzzy_sets, rules)
+    results['diagnose_compiled'] = _latencies(readings, fuzzy_sets, compiled)
+
+    seconds, _ = _timed(diagnose_batch, df, fuzzy_sets, compiled, sensors=sensors, repeat=repeat)
+    results['diagnose_batch'] = {
+        'seconds': seconds,
+        'rows_per_second': n_rows / seconds,
+        'peak_bytes': _peak_memory(diagnose_batch, df, fuzzy_sets, compiled, sensors=sensors),
+    }
+    return results
+
+
+def check_batch_memory(n_rows=200_000, n_sensors=8, method='histogram'):
+    """
+    Peak memory of diagnose_batch against thousands of rules, and the limit it must stay under.
+
+    The limit is BATCH_MEMORY_BYTES for the (rows x rules) arrays plus a fixed allowance per
+    row for the input copy and the result arrays, and 16 MiB of slack.
+    """
+    df = make_dataset(n_rows, n_sensors=n_sensors)
+    sensors = sensor_names(n_sensors)
+    fuzzy_sets = {s: auto_partition(df[s], method=method) for s in sensors}
+    compiled = compile_rules(generate_rules(df, fuzzy_sets, label_column=LABEL_COLUMN, sensors=sensors), fuzzy_sets)
+    limit = BATCH_MEMORY_BYTES + n_rows * (8 * n_sensors + 256) + 16 * 2 ** 20
+    seconds, _ = _timed(diagnose_batch, df, fuzzy_sets, compiled, sensors=sensors)
+    return {'rows': n_rows, 'n_rules': len(compiled['consequents']), 'seconds': seconds,
+            'peak_bytes': _peak_memory(diagnose_batch, df, fuzzy_sets, compiled, sensors=sensors),
+            'limit_bytes': limit}
+
+
+def workload_key(n_rows, n_sensors, n_sets, n_faults):
+    return f"rows={n_rows},sensors={n_sensors},sets={n_sets},faults={n_faults}"
+
+
+def compare(current, baseline, tolerance):
+    """
+    Lists metrics that got worse than the baseline by more than tolerance (a fraction).
+
+    Returns:
+        list of dict: One entry per regression, with workload, stage, metric, baseline,
+                      current and relative change.
+    """
+    regressions = []
+    for key, stages in current['workloads'].items():
+        for stage, metrics in stages.items():
+            for metric, value in metrics.items():
+                old = baseline.get('workloads', {}).get(key, {}).get(stage, {}).get(metric)
+                if old is None or metric == 'n_rules' or old == 0:
+                    continue
+                if metric in HIGHER_IS_BETTER:
+                    change = old / value - 1.0 if value else np.inf
+                else:
+                    change = value / old - 1.0
+                if change > tolerance:
+                    regressions.append({'workload': key, 'stage': stage, 'metric': metric,
+                                        'baseline': old, 'current': value, 'change': change})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--sensors', type=int, nargs='+', default=[8])
+    parser.add_argument('--sets', type=int, nargs='+', default=[3])
+    parser.add_argument('--faults', type=int, nargs='+', default=[4])
+    parser.add_argument('--readings', type=int, default=1000, help="readings for latency percentiles")
+    parser.add_argument('--repeat', type=int, default=3, help="timing repeats (best is kept)")
+    parser.add_argument('--method', default='kmeans', help="auto_partition clustering backend")
+    parser.add_argument('--output', help="write results JSON here")
+    parser.add_argument('--compare', help="baseline results JSON to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed relative slowdown, e.g. 0.2 = 20%%")
+    parser.add_argument('--memory-check', action='store_true',
+                        help="check diagnose_batch peak memory against thousands of rules")
+    parser.add_argument('--memory-check-rows', type=int, default=200_000)
+    args = parser.parse_args()
+
+    report = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'method': args.method,
+        'workloads': {},
+    }
+    for n_rows, n_sensors, n_sets, n_faults in itertools.product(args.rows, args.sensors, args.sets, args.faults):
+        key = workload_key(n_rows, n_sensors, n_sets, n_faults)
+        print(f"{key} ...", file=sys.stderr)
+        report['workloads'][key] = run_workload(n_rows, n_sensors, n_sets, n_faults, n_readings=args.readings,
+                                                repeat=args.repeat, method=args.method)
+
+    if args.memory_check:
+        print("diagnose_batch memory check ...", file=sys.stderr)
+        report['batch_memory'] = check_batch_memory(args.memory_check_rows)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    failed = False
+    if args.memory_check:
+        m = report['batch_memory']
+        ok = m['peak_bytes'] <= m['limit_bytes']
+        failed |= not ok
+        print(f"diagnose_batch {m['rows']} rows x {m['n_rules']} rules: peak {m['peak_bytes'] / 2 ** 20:.0f} MiB, "
+              f"limit {m['limit_bytes'] / 2 ** 20:.0f} MiB {'ok' if ok else 'FAIL'}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['workload']} {r['stage']}.{r['metric']}: "
+                  f"{r['baseline']:.6g} -> {r['current']:.6g} ({r['change']:+.0%})", file=sys.stderr)
+        failed |= bool(regressions)
+        if not regressions:
+            print(f"No regressions beyond {args.tolerance:.0%} against {args.compare}", file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Synthetic sensor datasets for benchmarking.
+
+Each fault class has its own operating point per sensor, so the generated data has the
+structure the rule induction looks for: readings cluster by class, with noise and some
+overlap between classes.
+"""
+import numpy as np
+import pandas as pd
+
+LABEL_COLUMN = 'Fault_Condition'
+
+
+def sensor_names(n_sensors):
+    """Column names used for synthetic sensors."""
+    return [f'sensor_{i}' for i in range(n_sensors)]
+
+
+def make_dataset(n_rows, n_sensors=8, n_faults=4, noise=0.35, seed=0):
+    """
+    Generates a synthetic sensor dataset.
+
+    Args:
+        n_rows (int): Number of readings.
+        n_sensors (int, optional): Number of sensor columns. Defaults to 8.
+        n_faults (int, optional): Number of fault classes (labels 0..n_faults-1). Defaults to 4.
+        noise (float, optional): Noise level relative to the spread of the class operating
+            points. Defaults to 0.35.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        pd.DataFrame: One column per sensor plus LABEL_COLUMN.
+    """
+    rng = np.random.default_rng(seed)
+    scales = rng.uniform(1.0, 1000.0, n_sensors) # sensors have different units and ranges
+    offsets = rng.uniform(-100.0, 1000.0, n_sensors)
+    class_means = rng.uniform(0.0, 1.0, (n_faults, n_sensors))
+    labels = rng.integers(0, n_faults, n_rows)
+    values = class_means[labels] + rng.normal(0.0, noise * 0.5, (n_rows, n_sensors))
+    df = pd.DataFrame(values * scales + offsets, columns=sensor_names(n_sensors))
+    df[LABEL_COLUMN] = labels
+    return df
+
+
+def make_readings(df, n_sensors, n_readings, seed=1):
+    """Draws n_readings rows of df as reading dicts, for single-reading latency benchmarks."""
+    rows = np.random.default_rng(seed).integers(0, len(df), n_readings)
+    return df.iloc[rows][sensor_names(n_sensors)].to_dict(orient='records')
@@ -0,0 +1,51 @@
+"""
+Fuzzy rule-based fault diagnosis.
+
+The public functions are re-exported here lazily: a submodule is only imported when one
+of its names is first accessed. Scoring with `load_model` + `diagnose` therefore imports
+NumPy and nothing else, while training (pandas, scikit-learn for method='kmeans') and
+plotting (matplotlib) are loaded only when used.
+"""
+import importlib
+
+_EXPORTS = {
+    'diagnose': 'fuzzy.inference_engine',
+    'diagnose_batch': 'fuzzy.inference_engine',
+    'stream_diagnose': 'fuzzy.streaming',
+    'compile_rules': 'fuzzy.rule_compiler',
+    'CachedDiagnoser': 'fuzzy.lookup',
+    'build_lookup_tables': 'fuzzy.lookup',
+    'load_model': 'fuzzy.model_io',
+    'save_model': 'fuzzy.model_io',
+    'auto_partition': 'fuzzy.partition',
+    'generate_rules': 'fuzzy.rule_generator',
+    'compact_rules': 'fuzzy.compaction',
+    'compaction_report': 'fuzzy.compaction',
+    'train_from_csv': 'fuzzy.training',
+    'train_parallel': 'fuzzy.training',
+    'cross_validate': 'fuzzy.evaluation',
+    'IncrementalLearner': 'fuzzy.incremental',
+    'add_sink': 'fuzzy.instrumentation',
+    'remove_sink': 'fuzzy.instrumentation',
+    'MetricsRecorder': 'fuzzy.instrumentation',
+    'LoggingSink': 'fuzzy.instrumentation',
+    'plot_all_sensor_partitions': 'fuzzy.visualization',
+    'plot_input_membership_for_rule_antecedent': 'fuzzy.visualization',
+    'ActivationRenderer': 'fuzzy.report',
+    'render_activation_reports': 'fuzzy.report',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'fuzzy' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,175 @@
+import numpy as np
+
+# Default number of histogram bins for the 'histogram' clustering backend
+DEFAULT_HISTOGRAM_BINS = 1024
+
+
+def kmeans_1d(values, n_clusters, weights=None):
+    """
+    Exact (globally optimal) k-means for one-dimensional data.
+
+    Sorted data splits into contiguous clusters, so the optimum is found by dynamic
+    programming over split points. The optimal split is monotone in the right end of the
+    last cluster, which lets every DP layer be solved by divide and conquer; each level of
+    that recursion is evaluated for all open intervals at once with array operations,
+    giving O(n_clusters * n log n) work on the distinct values.
+
+    This backend is for clustering quality, not speed: its result is the global optimum
+    and deterministic, but on large inputs with many distinct values it can be several
+    times slower than scikit-learn's KMeans. Where speed matters, the 'histogram' method
+    (kmeans_1d_binned) approximates it on a fixed number of bins.
+
+    Args:
+        values (array-like): Data points (or bin means when weights are given).
+        n_clusters (int): Number of clusters wanted.
+        weights (array-like, optional): Non-negative weight of each value. Defaults to 1.
+
+    Returns:
+        np.ndarray: Sorted cluster centers. Fewer than n_clusters are returned when there
+                    are fewer distinct values.
+    """
+    values = np.asarray(values, dtype=float).reshape(-1)
+    weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype=float).reshape(-1)
+    keep = weights > 0
+    x, inverse = np.unique(values[keep], return_inverse=True)
+    w = np.bincount(inverse.reshape(-1), weights=weights[keep], minlength=len(x))
+    m = len(x)
+    k = min(n_clusters, m)
+    if k == 0:
+        return np.empty(0)
+
+    # Prefix sums of weight, weighted value and weighted square; centering keeps them well conditioned
+    shift = np.average(x, weights=w)
+    xc = x - shift
+    cw = np.concatenate([[0.0], np.cumsum(w)])
+    cs = np.concatenate([[0.0], np.cumsum(w * xc)])
+    cq = np.concatenate([[0.0], np.cumsum(w * xc * xc)])
+
+    def cost(j, i):
+        # within-cluster sum of squares of points j..i (inclusive)
+        sw = cw[i + 1] - cw[j]
+        ss = cs[i + 1] - cs[j]
+        return np.maximum(cq[i + 1] - cq[j] - ss * ss / sw, 0.0)
+
+    idx = np.arange(m)
+    prev = cost(np.zeros(m, dtype=np.intp), idx) # one cluster over points 0..i
+    splits = [np.zeros(m, dtype=np.intp)]
+    for c in range(1, k):
+        if c == k - 1:
+            # the last cluster only has to end at the last point: one vectorized scan
+            j = np.arange(c, m)
+            total = prev[j - 1] + cost(j, np.full(len(j), m - 1))
+            arg = np.zeros(m, dtype=np.intp)
+            arg[m - 1] = j[np.argmin(total)]
+            splits.append(arg)
+            break
+        best = np.full(m, np.inf)
+        arg = np.zeros(m, dtype=np.intp)
+        # open intervals (lo, hi) of right ends still to solve, with their split search range
+        lo, hi = np.array([c]), np.array([m - 1])
+        opt_lo, opt_hi = np.array([c]), np.array([m - 1])
+        while len(lo):
+            mid = (lo + hi) // 2
+            end = np.minimum(mid, opt_hi)
+            lengths = end - opt_lo + 1
+            task = np.repeat(np.arange(len(lo)), lengths)
+            starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+            j = opt_lo[task] + np.arange(len(task)) - starts[task]
+            total = prev[j - 1] + cost(j, mid[task])
+            seg_min = np.minimum.reduceat(total, starts)
+            hit = np.flatnonzero(total == seg_min[task])
+            first = hit[np.concatenate([[True], task[hit][1:] != task[hit][:-1]])]
+            j_star = j[first]
+            best[mid] = seg_min
+            arg[mid] = j_star
+
+            left = lo <= mid - 1
+            right = mid + 1 <= hi
+            lo, hi, opt_lo, opt_hi = (np.concatenate([lo[left], mid[right] + 1]),
+                                      np.concatenate([mid[left] - 1, hi[right]]),
+                                      np.concatenate([opt_lo[left], j_star[right]]),
+                                      np.concatenate([j_star[left], opt_hi[right]]))
+        prev = best
+        splits.append(arg)
+
+    # Backtrack the cluster boundaries and return the weighted means
+    centers = np.empty(k)
+    i = m - 1
+    for c in range(k - 1, -1, -1):
+        j = splits[c][i]
+        centers[c] = shift + (cs[i + 1] - cs[j]) / (cw[i + 1] - cw[j])
+        i = j - 1
+    return centers
+
+
+def histogram_stats(values, edges):
+    """
+    Per-bin count and sum of values, the mergeable summary used by the 'histogram' backend.
+
+    Values outside the edges are clipped into the first/last bin. Summaries of several chunks
+    of data with the same edges can be added together.
+
+    Returns:
+        tuple: (counts, sums), float arrays of length len(edges) - 1.
+    """
+    values = np.asarray(values, dtype=float).reshape(-1)
+    values = values[~np.isnan(values)]
+    n_bins = len(edges) - 1
+    width = (edges[-1] - edges[0]) / n_bins
+    if width > 0 and np.allclose(np.diff(edges), width):
+        bins = ((values - edges[0]) / width).astype(np.intp) # equal-width bins: no search needed
+    else:
+        bins = np.searchsorted(edges, values, side='right') - 1
+    bins = np.clip(bins, 0, n_bins - 1)
+    counts = np.bincount(bins, minlength=n_bins).astype(float)
+    sums = np.bincount(bins, weights=values, minlength=n_bins)
+    return counts, sums
+
+
+def kmeans_1d_binned(counts, sums, n_clusters):
+    """
+    Approximate 1-D k-means from a histogram summary (see histogram_stats).
+
+    Each non-empty bin is treated as a weighted point at the mean of its values, and the
+    weighted problem is solved exactly with kmeans_1d. Cluster boundaries are therefore
+    only resolved to the bin width.
+    """
+    counts = np.asarray(counts, dtype=float)
+    sums = np.asarray(sums, dtype=float)
+    filled = counts > 0
+    return kmeans_1d(sums[filled] / counts[filled], n_clusters, weights=counts[filled])
+
+
+def cluster_centers(values, n_clusters, method='kmeans', random_state=42, bins=DEFAULT_HISTOGRAM_BINS,
+                    value_range=None):
+    """
+    Sorted 1-D cluster centers using the selected backend.
+
+    Args:
+        values (np.ndarray): 1-D data.
+        n_clusters (int): Number of clusters.
+        method (str, optional): 'kmeans' (scikit-learn KMeans, a local optimum), 'exact'
+            (kmeans_1d) or 'histogram' (kmeans_1d_binned over `bins` equal-width bins).
+            Defaults to 'kmeans'.
+        random_state (int, optional): Random state for KMeans. Defaults to 42.
+        bins (int, optional): Number of bins for 'histogram'. Defaults to DEFAULT_HISTOGRAM_BINS.
+        value_range (tuple of float, optional): Histogram range. Defaults to the data range.
+
+    Returns:
+        np.ndarray: Sorted centers (may contain duplicates for 'kmeans').
+    """
+    values = np.asarray(values, dtype=float).reshape(-1)
+    if method == 'kmeans':
+        from sklearn.cluster import KMeans
+        # n_init='auto' is for scikit-learn >= 1.2. Use n_init=10 for older versions if needed.
+        kmeans = KMeans(n_clusters=n_clusters, n_init='auto', random_state=random_state)
+        kmeans.fit(values.reshape(-1, 1))
+        return np.sort(kmeans.cluster_centers_.flatten())
+    if method == 'exact':
+        return kmeans_1d(values, n_clusters)
+    if method == 'histogram':
+        if value_range is None:
+            value_range = (np.nanmin(values), np.nanmax(values))
+        edges = np.linspace(value_range[0], value_range[1], bins + 1)
+        return kmeans_1d_binned(*histogram_stats(values, edges), n_clusters)
+    raise ValueError("method must be 'kmeans', 'exact' or 'histogram'")
@@ -0,0 +1,158 @@
+import time
+from fuzzy.inference_engine import diagnose_batch
+from fuzzy.membership import region_names
+
+
+def compact_rules(rules, fuzzy_sets, min_support=0.0, min_confidence=0.0, top_k=None, merge=True, max_missing=0):
+    """
+    Shrinks a rule base by merging, pruning and capping rules.
+
+    Steps, in order:
+    1. Merging (if merge=True): rules with the same consequent whose antecedents differ only
+       in one sensor's region are replaced by one rule without that sensor (a don't-care,
+       which diagnose evaluates as the min over the remaining sensors). A group is merged when
+       it covers all of the sensor's regions but at most max_missing, and no rule with another
+       consequent has the same regions on the remaining sensors. Repeated until nothing
+       merges. The merged support and confidence are those generate_rules would give the
+       pooled rows, and the priority is the merged confidence.
+    2. Pruning: rules with support < min_support or confidence < min_confidence are dropped.
+    3. Capping: only the top_k rules by priority are kept for each consequent.
+
+    Merging changes diagnoses, even with max_missing=0. Dropping a sensor removes its
+    membership from the min, so the merged rule also fires at full strength where that
+    sensor's membership is low or zero (between region peaks, outside the universe), and
+    can then beat rules with other consequents. max_missing > 0 widens this further. Check
+    the effect on held-out data with compaction_report.
+
+    Args:
+        rules (list of dict): Rules sorted by priority, as returned by generate_rules.
+        fuzzy_sets (dict): Fuzzy set data per sensor, used for each sensor's region names.
+        min_support (float, optional): Minimum rule support. Defaults to 0.0.
+        min_confidence (float, optional): Minimum rule confidence. Defaults to 0.0.
+        top_k (int, optional): Most rules kept per consequent. Defaults to no cap.
+        merge (bool, optional): Whether to merge rules into don't-care antecedents. Defaults to True.
+        max_missing (int, optional): Regions a merged group may lack. Defaults to 0.
+
+    Returns:
+        list of dict: The compacted rules, sorted by priority (ties keep their input order).
+    """
+    if merge:
+        rules = merge_rules(rules, fuzzy_sets, max_missing=max_missing)
+    kept = [rule for rule in rules
+            if rule.get('support', 0.0) >= min_support and rule.get('confidence', 0.0) >= min_confidence]
+    if top_k is not None:
+        per_consequent = {}
+        capped = []
+        for rule in sorted(kept, key=lambda r: r['priority'], reverse=True):
+            n = per_consequent.get(rule['consequent'], 0)
+            if n < top_k:
+                per_consequent[rule['consequent']] = n + 1
+                capped.append(rule)
+        kept = capped
+    return sorted(kept, key=lambda r: r['priority'], reverse=True)
+
+
+def merge_rules(rules, fuzzy_sets, max_missing=0):
+    """
+    Merges rules that differ only in one sensor's region into don't-care antecedents.
+
+    See compact_rules. Support and confidence are combined from the pooled row counts, which
+    are proportional to support (rule rows) and support / confidence (antecedent rows).
+
+    Returns:
+        list of dict: The merged rules, sorted by priority.
+    """
+    # entries keyed by (antecedent items, consequent) -> [antecedent dict, support, antecedent mass]
+    entries = {}
+    for rule in rules:
+        key = (tuple(rule['antecedent'].items()), rule['consequent'])
+        support, confidence = rule['support'], rule['confidence']
+        entry = entries.setdefault(key, [dict(rule['antecedent']), 0.0, 0.0])
+        entry[1] += support
+        entry[2] += support / confidence if confidence > 0 else 0.0
+
+    sensors = []
+    for items, _ in entries:
+        for sensor, _ in items:
+            if sensor not in sensors:
+                sensors.append(sensor)
+
+    changed = True
+    while changed:
+        changed = False
+        for sensor in sensors:
+            needed = set(region_names(fuzzy_sets.get(sensor)))
+            if not needed:
+                continue
+            groups = {}
+            rest_consequents = {} # consequents seen on each antecedent without this sensor
+            for key, entry in entries.items():
+                antecedent = entry[0]
+                if sensor in antecedent:
+                    rest = tuple((s, r) for s, r in key[0] if s != sensor)
+                    if len(antecedent) > 1:
+                        groups.setdefault((rest, key[1]), []).append(key)
+                else:
+                    rest = key[0]
+                rest_consequents.setdefault(rest, set()).add(key[1])
+            for (rest, consequent), keys in groups.items():
+                covered = {entries[key][0][sensor] for key in keys}
+                if len(needed - covered) > max_missing or len(covered) < 2 or len(rest_consequents[rest]) > 1:
+                    continue
+                merged = entries.setdefault((rest, consequent), [dict(rest), 0.0, 0.0])
+                for key in keys:
+                    _, support, mass = entries.pop(key)
+                    merged[1] += support
+                    merged[2] += mass
+                changed = True
+
+    merged_rules = []
+    for (_, consequent), (antecedent, support, mass) in entries.items():
+        confidence = support / mass if mass > 0 else 0.0
+        merged_rules.append({
+            'antecedent': antecedent,
+            'consequent': consequent,
+            'support': support,
+            'confidence': confidence,
+            'priority': confidence
+        })
+    return sorted(merged_rules, key=lambda r: r['priority'], reverse=True)
+
+
+def compaction_report(rules, compacted, fuzzy_sets, held_out, label_column, threshold=0.4, sensors=None):
+    """
+    Compares a rule base with its compacted version on held-out data.
+
+    Args:
+        rules (list of dict): The original rules.
+        compacted (list of dict): The compacted rules, e.g. from compact_rules.
+        fuzzy_sets (dict): Fuzzy set data per sensor.
+        held_out (pd.DataFrame): Readings not used for training, with label_column.
+        label_column (str): Column holding the true fault label.
+        threshold (float, optional): Diagnosis threshold. Defaults to 0.4.
+        sensors (list of str, optional): Sensor columns to score. Defaults to the columns
+            that have fuzzy sets.
+
+    Returns:
+        dict: 'rules_before', 'rules_after', 'shrink' (fraction of rules removed), and for
+              'before' and 'after': 'accuracy' (share of rows diagnosed correctly, rows without
+              a diagnosis count as wrong), 'coverage' (share of rows diagnosed at all) and
+              'seconds' (diagnose_batch time).
+    """
+    if sensors is None:
+        sensors = [s for s in held_out.columns if s != label_column and s in fuzzy_sets]
+    labels = held_out[label_column].to_numpy()
+    report = {'rules_before': len(rules), 'rules_after': len(compacted),
+              'shrink': 1.0 - len(compacted) / len(rules) if rules else 0.0}
+    for name, rule_set in (('before', rules), ('after', compacted)):
+        start = time.perf_counter()
+        out = diagnose_batch(held_out, fuzzy_sets, rule_set, threshold=threshold, sensors=sensors)
+        seconds = time.perf_counter() - start
+        met = out['status'] == 'threshold_met'
+        correct = met & (out['diagnosed_consequent'] == labels)
+        report[name] = {
+            'accuracy': float(correct.mean()) if len(labels) else float('nan'),
+            'coverage': float(met.mean()) if len(labels) else float('nan'),
+            'seconds': seconds,
+        }
+    return report
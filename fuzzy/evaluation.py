@@ -0,0 +1,163 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from fuzzy.inference_engine import diagnose_batch
+from fuzzy.partition import auto_partition
+from fuzzy.rule_compiler import compile_rules
+from fuzzy.rule_generator import count_rule_pairs, rules_from_counts
+from fuzzy.training import attach_columns, shared_columns
+
+# Thresholds evaluated by default: 0.0, 0.05, ..., 1.0
+DEFAULT_THRESHOLDS = np.round(np.linspace(0.0, 1.0, 21), 2)
+
+
+def fold_assignment(n_rows, n_folds, random_state=42):
+    """Fold number of every row: a random permutation split into n_folds near-equal folds."""
+    folds = np.empty(n_rows, dtype=np.intp)
+    folds[np.random.default_rng(random_state).permutation(n_rows)] = np.arange(n_rows) % n_folds
+    return folds
+
+
+def threshold_sweep(true_codes, predicted_codes, strengths, n_labels, thresholds=DEFAULT_THRESHOLDS):
+    """
+    Accuracy, coverage and confusion matrices for a whole grid of thresholds.
+
+    A row is diagnosed at threshold t when the firing strength of its strongest rule is
+    >= t, exactly as in diagnose. The strengths of every (true, predicted) label pair are
+    sorted once, and the counts at each threshold come from a binary search, so the grid
+    costs O(n log n) in total rather than one pass per threshold.
+
+    Args:
+        true_codes (np.ndarray): True label code of each row.
+        predicted_codes (np.ndarray): Label code of each row's strongest rule, -1 if no rule applied.
+        strengths (np.ndarray): Firing strength of each row's strongest rule, NaN if no rule applied.
+        n_labels (int): Number of label codes.
+        thresholds (array-like, optional): Thresholds to evaluate. Defaults to DEFAULT_THRESHOLDS.
+
+    Returns:
+        dict: 'thresholds' (T), 'accuracy' (T, correct diagnoses / rows), 'coverage' (T, rows
+              diagnosed / rows), 'covered_accuracy' (T, correct / diagnosed, NaN if none),
+              'confusion' (int array T x labels x labels+1: true label, diagnosed label, last
+              column for rows without a diagnosis) and 'per_fault' (int array T x labels x 4
+              of one-vs-rest true positives, false positives, false negatives, true negatives).
+    """
+    thresholds = np.asarray(thresholds, dtype=float)
+    true_codes = np.asarray(true_codes)
+    n_rows = len(true_codes)
+    applied = (predicted_codes >= 0) & ~np.isnan(strengths)
+    pairs = true_codes[applied] * n_labels + predicted_codes[applied]
+    pair_strengths = strengths[applied]
+
+    confusion = np.zeros((len(thresholds), n_labels, n_labels + 1), dtype=np.int64)
+    order = np.lexsort((pair_strengths, pairs))
+    pairs, pair_strengths = pairs[order], pair_strengths[order]
+    starts = np.flatnonzero(np.concatenate([[True], pairs[1:] != pairs[:-1]])) if len(pairs) else np.empty(0, dtype=np.intp)
+    for start, stop in zip(starts, np.append(starts[1:], len(pairs))):
+        true, predicted = divmod(int(pairs[start]), n_labels)
+        below = np.searchsorted(pair_strengths[start:stop], thresholds, side='left')
+        confusion[:, true, predicted] = (stop - start) - below
+    per_label = np.bincount(true_codes, minlength=n_labels)
+    confusion[:, :, -1] = per_label[None, :] - confusion[:, :, :-1].sum(axis=2)
+
+    correct = np.trace(confusion[:, :, :-1], axis1=1, axis2=2)
+    diagnosed = confusion[:, :, :-1].sum(axis=(1, 2))
+    tp = np.diagonal(confusion[:, :, :-1], axis1=1, axis2=2)
+    fp = confusion[:, :, :-1].sum(axis=1) - tp
+    fn = per_label[None, :] - tp
+    tn = n_rows - tp - fp - fn
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            'thresholds': thresholds,
+            'accuracy': correct / n_rows if n_rows else np.full(len(thresholds), np.nan),
+            'coverage': diagnosed / n_rows if n_rows else np.full(len(thresholds), np.nan),
+            'covered_accuracy': np.where(diagnosed > 0, correct / diagnosed, np.nan),
+            'confusion': confusion,
+            'per_fault': np.stack([tp, fp, fn, tn], axis=2),
+        }
+
+
+def _fold_worker(shm_name, shape, labels_name, label_values, sensors, fold, n_folds, random_state,
+                 partition_kwargs):
+    shm, values = attach_columns(shm_name, shape, np.float64)
+    labels_shm, label_codes = attach_columns(labels_name, (shape[1],), np.int64)
+    try:
+        folds = fold_assignment(shape[1], n_folds, random_state)
+        train, test = np.flatnonzero(folds != fold), np.flatnonzero(folds == fold)
+        fuzzy_sets = {sensor: auto_partition(pd.Series(values[i, train]), random_state=random_state,
+                                             **partition_kwargs)
+                      for i, sensor in enumerate(sensors)}
+        columns = {sensor: values[i, train] for i, sensor in enumerate(sensors)}
+        labels = np.asarray(label_values, dtype=object)[label_codes[train]]
+        compiled = compile_rules(rules_from_counts(count_rule_pairs(columns, labels, fuzzy_sets)), fuzzy_sets)
+        # threshold 0 keeps every row's strongest rule; thresholds are applied by threshold_sweep
+        out = diagnose_batch(values[:, test].T, fuzzy_sets, compiled, threshold=0.0, sensors=sensors)
+        label_index = {label: code for code, label in enumerate(label_values)}
+        rule_codes = np.array([label_index[label] for label in compiled['labels']], dtype=np.intp)
+        predicted = np.full(len(test), -1, dtype=np.intp)
+        applied = out['rule_index'] >= 0
+        predicted[applied] = rule_codes[compiled['consequents'][out['rule_index'][applied]]]
+        return test, predicted, out['firing_strength'], len(compiled['consequents'])
+    finally:
+        del values, label_codes
+        shm.close()
+        labels_shm.close()
+
+
+def cross_validate(df, sensors, label_column, n_folds=5, thresholds=DEFAULT_THRESHOLDS, n_workers=None,
+                   random_state=42, **partition_kwargs):
+    """
+    k-fold cross-validation of auto_partition + generate_rules + diagnosis.
+
+    Each fold trains on the other folds and scores its own rows once, keeping every row's
+    strongest rule and firing strength; all thresholds are then evaluated from those
+    out-of-fold results with threshold_sweep. Folds run on a process pool and read the
+    data from shared memory, as in train_parallel.
+
+    Args:
+        df (pd.DataFrame): Data with the sensor columns and label_column.
+        sensors (list of str): Sensor columns to partition and use in rules.
+        label_column (str): Column holding the fault label.
+        n_folds (int, optional): Number of folds. Defaults to 5.
+        thresholds (array-like, optional): Thresholds to evaluate. Defaults to DEFAULT_THRESHOLDS.
+        n_workers (int, optional): Number of worker processes; 1 runs the folds in this process.
+            Defaults to min(n_folds, os.cpu_count()).
+        random_state (int, optional): Seed of the fold split and of KMeans. Defaults to 42.
+        **partition_kwargs: Passed on to auto_partition (num_sets, method, ...).
+
+    Returns:
+        dict: The threshold_sweep results over all out-of-fold rows, plus 'labels' (the label
+              of each code), 'fold_accuracy' (folds x T), 'rule_counts' (rules per fold),
+              'predicted' (per-row strongest-rule label, None if no rule applied) and
+              'firing_strength' (per-row strongest-rule strength).
+    """
+    if n_workers is None:
+        n_workers = min(n_folds, os.cpu_count() or 1)
+    n_rows = len(df)
+    shape = (len(sensors), n_rows)
+
+    with shared_columns(df, sensors, label_column) as (values_name, labels_name, label_values, label_codes):
+        args = [(values_name, shape, labels_name, label_values, sensors, fold, n_folds, random_state,
+                 partition_kwargs) for fold in range(n_folds)]
+        if n_workers == 1:
+            results = [_fold_worker(*a) for a in args]
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                results = [future.result() for future in [pool.submit(_fold_worker, *a) for a in args]]
+
+    predicted = np.full(n_rows, -1, dtype=np.intp)
+    strengths = np.full(n_rows, np.nan)
+    fold_accuracy = []
+    for test, fold_predicted, fold_strengths, _ in results:
+        predicted[test] = fold_predicted
+        strengths[test] = fold_strengths
+        fold_accuracy.append(threshold_sweep(label_codes[test], fold_predicted, fold_strengths,
+                                             len(label_values), thresholds)['accuracy'])
+
+    report = threshold_sweep(label_codes, predicted, strengths, len(label_values), thresholds)
+    predicted_labels = np.full(n_rows, None, dtype=object)
+    predicted_labels[predicted >= 0] = np.asarray(label_values, dtype=object)[predicted[predicted >= 0]]
+    report.update(labels=label_values, fold_accuracy=np.array(fold_accuracy),
+                  rule_counts=[result[3] for result in results],
+                  predicted=predicted_labels, firing_strength=strengths)
+    return report
@@ -0,0 +1,215 @@
+from collections import Counter
+import numpy as np
+import pandas as pd
+from fuzzy.membership import is_analytic, region_names, universe_bounds
+from fuzzy.partition import auto_partition
+from fuzzy.rule_generator import count_rule_pairs, rules_from_counts
+from fuzzy.training import DEFAULT_SAMPLE_SIZE
+
+# Drift detection defaults: population stability index limit; share and least number of
+# readings outside the universe; margin around the universe (fraction of its width) within
+# which a reading still counts as inside; number of reference histogram bins
+DEFAULT_PSI_THRESHOLD = 0.25
+DEFAULT_MAX_OUTSIDE = 0.01
+DEFAULT_MIN_OUTSIDE = 10
+DEFAULT_OUTSIDE_MARGIN = 0.05
+DEFAULT_DRIFT_BINS = 10
+_PSI_FLOOR = 1e-4 # bin share floor, keeps the PSI finite for empty bins
+
+
+def population_stability_index(reference, current):
+    """
+    PSI between two histograms over the same bins: sum((c - r) * ln(c / r)) of bin shares.
+
+    Below 0.1 is usually read as no shift, 0.1-0.25 as moderate and above 0.25 as large.
+    """
+    r = np.maximum(np.asarray(reference, dtype=float) / max(np.sum(reference), 1), _PSI_FLOOR)
+    c = np.maximum(np.asarray(current, dtype=float) / max(np.sum(current), 1), _PSI_FLOOR)
+    return float(np.sum((c - r) * np.log(c / r)))
+
+
+class IncrementalLearner:
+    """
+    Keeps a model up to date from labelled batches without rescanning old data.
+
+    The persistent state holds:
+    - the rule co-occurrence Counter (see count_rule_pairs), so a new batch only adds its
+      own counts, and rules() rebuilds support/confidence/priority from the totals;
+    - per sensor, the running min/max and a reference histogram of the data the current
+      partition was fitted on;
+    - a bounded uniform sample of all rows seen (a bottom-k sample, as in
+      scan_sensor_ranges).
+
+    A sensor is re-partitioned only when more than max_outside of a batch's readings, and at
+    least min_outside of them, lie outside the sensor's universe widened by outside_margin
+    on each side, or when the batch's population stability index against the reference
+    histogram exceeds psi_threshold. The new partition is fitted with auto_partition on the
+    sample, over the running min/max. Old rows cannot be recounted, so existing counts are
+    remapped: each old region of the sensor is renamed to the new region with the nearest
+    peak, and counts that land on the same rule are added. This is an approximation. Rows
+    near a moved boundary keep their old region until they age out of importance relative to
+    new data.
+
+    The universe is the min/max of the data seen so far, so new readings from the same
+    distribution still land just outside it: after n rows, about 2 / (n + 1) of them, and
+    more for long-tailed sensors. The margin and min_outside keep such readings from
+    triggering a refit when batches are small. Readings outside the universe that do not
+    trigger a refit are counted in the nearest edge region (below the universe in the
+    lowest region, above it in the highest). With outside_margin=0 and min_outside=0,
+    max_outside must be well above 2 / (rows seen + 1). The PSI of a small batch is noisy as
+    well, roughly (drift_bins - 1) / batch rows on stationary data, so batches of a few
+    hundred rows occasionally exceed psi_threshold.
+
+    The first update() fits every sensor, as auto_partition + generate_rules would.
+
+    Args:
+        sensors (list of str): Sensor columns to partition and use in rules.
+        label_column (str): Column holding the fault label.
+        sample_size (int, optional): Rows kept for re-partitioning. Defaults to DEFAULT_SAMPLE_SIZE.
+        psi_threshold (float, optional): PSI that triggers re-partitioning. Defaults to
+            DEFAULT_PSI_THRESHOLD.
+        max_outside (float, optional): Share of a batch's readings outside the universe that
+            triggers re-partitioning. Defaults to DEFAULT_MAX_OUTSIDE.
+        min_outside (int, optional): Least number of readings outside the universe that
+            triggers re-partitioning. Defaults to DEFAULT_MIN_OUTSIDE.
+        outside_margin (float, optional): Fraction of the universe width added on each side
+            before readings count as outside. Defaults to DEFAULT_OUTSIDE_MARGIN.
+        drift_bins (int, optional): Quantile bins of the reference histograms. Defaults to
+            DEFAULT_DRIFT_BINS.
+        random_state (int, optional): Seed for sampling and KMeans. Defaults to 42.
+        **partition_kwargs: Passed on to auto_partition (num_sets, method, ...).
+    """
+
+    def __init__(self, sensors, label_column, sample_size=DEFAULT_SAMPLE_SIZE, psi_threshold=DEFAULT_PSI_THRESHOLD,
+                 max_outside=DEFAULT_MAX_OUTSIDE, min_outside=DEFAULT_MIN_OUTSIDE,
+                 outside_margin=DEFAULT_OUTSIDE_MARGIN, drift_bins=DEFAULT_DRIFT_BINS, random_state=42,
+                 **partition_kwargs):
+        self.sensors = list(sensors)
+        self.label_column = label_column
+        self.sample_size = sample_size
+        self.psi_threshold = psi_threshold
+        self.max_outside = max_outside
+        self.min_outside = min_outside
+        self.outside_margin = outside_margin
+        self.drift_bins = drift_bins
+        self.random_state = random_state
+        self.partition_kwargs = partition_kwargs
+        self.fuzzy_sets = {}
+        self.counts = Counter()
+        self.n_rows = 0
+        self._rng = np.random.default_rng(random_state)
+        self._mins = np.full(len(self.sensors), np.inf)
+        self._maxs = np.full(len(self.sensors), -np.inf)
+        self._sample = np.empty((0, len(self.sensors)))
+        self._sample_keys = np.empty(0)
+        self._reference = {} # sensor -> (inner bin edges, reference counts)
+
+    def update(self, df):
+        """
+        Folds a labelled batch into the model.
+
+        Args:
+            df (pd.DataFrame): Batch with the sensor columns and label_column.
+
+        Returns:
+            dict: 'rows' (batch size), 'out_of_universe' (share of readings outside the universe
+                  plus margin) and 'psi' (per sensor, measured
+                  against the partition in use before this batch; empty on the first batch)
+                  and 'repartitioned' (sensors whose fuzzy sets were refitted).
+        """
+        values = df[self.sensors].to_numpy(dtype=float)
+        report = {'rows': len(values), 'out_of_universe': {}, 'psi': {}, 'repartitioned': []}
+        if not len(values):
+            return report
+
+        changed = []
+        for i, sensor in enumerate(self.sensors):
+            column = values[:, i][~np.isnan(values[:, i])]
+            if sensor not in self.fuzzy_sets or not len(column):
+                if sensor not in self.fuzzy_sets:
+                    changed.append(sensor)
+                continue
+            lo, hi = universe_bounds(self.fuzzy_sets[sensor])
+            margin = self.outside_margin * (hi - lo)
+            n_outside = int(np.count_nonzero((column < lo - margin) | (column > hi + margin)))
+            outside = n_outside / len(column)
+            edges, reference = self._reference[sensor]
+            psi = population_stability_index(reference, np.bincount(np.searchsorted(edges, column, side='right'),
+                                                                    minlength=len(reference)))
+            report['out_of_universe'][sensor] = outside
+            report['psi'][sensor] = psi
+            if (outside > self.max_outside and n_outside >= self.min_outside) or psi > self.psi_threshold:
+                changed.append(sensor)
+
+        self._mins = np.fmin(self._mins, np.nanmin(values, axis=0, initial=np.inf))
+        self._maxs = np.fmax(self._maxs, np.nanmax(values, axis=0, initial=-np.inf))
+        self._add_to_sample(values)
+        for sensor in changed:
+            self._repartition(sensor)
+        report['repartitioned'] = [s for s in changed if s in self.fuzzy_sets]
+
+        columns = {sensor: _clip_to_edge_regions(self.fuzzy_sets[sensor], values[:, i])
+                   for i, sensor in enumerate(self.sensors) if sensor in self.fuzzy_sets}
+        count_rule_pairs(columns, df[self.label_column].to_numpy(), self.fuzzy_sets, counts=self.counts)
+        self.n_rows += len(values)
+        return report
+
+    def rules(self):
+        """The current rules, sorted by priority, as generate_rules would build them from the counts."""
+        return rules_from_counts(self.counts)
+
+    def _add_to_sample(self, values):
+        keys = self._rng.random(len(values))
+        self._sample = np.concatenate([self._sample, values])
+        self._sample_keys = np.concatenate([self._sample_keys, keys])
+        if len(self._sample_keys) > self.sample_size:
+            keep = np.sort(np.argpartition(self._sample_keys, self.sample_size)[:self.sample_size])
+            self._sample, self._sample_keys = self._sample[keep], self._sample_keys[keep]
+
+    def _repartition(self, sensor):
+        i = self.sensors.index(sensor)
+        column = self._sample[:, i]
+        column = column[~np.isnan(column)]
+        if not len(column):
+            return
+        new_sets = auto_partition(pd.Series(column), value_range=(self._mins[i], self._maxs[i]),
+                                  random_state=self.random_state, **self.partition_kwargs)
+        old_sets = self.fuzzy_sets.get(sensor)
+        self.fuzzy_sets[sensor] = new_sets
+        if old_sets is not None:
+            self._remap_counts(sensor, old_sets, new_sets)
+        edges = np.unique(np.quantile(column, np.linspace(0, 1, self.drift_bins + 1)[1:-1]))
+        self._reference[sensor] = (edges, np.bincount(np.searchsorted(edges, column, side='right'),
+                                                      minlength=len(edges) + 1))
+
+    def _remap_counts(self, sensor, old_sets, new_sets):
+        old_peaks = _region_peaks(old_sets)
+        new_peaks = _region_peaks(new_sets)
+        new_names = list(new_peaks)
+        if not new_names:
+            return
+        centers = np.array([new_peaks[name] for name in new_names])
+        mapping = {name: new_names[int(np.argmin(np.abs(centers - peak)))] for name, peak in old_peaks.items()}
+        remapped = Counter()
+        for (rule_key, label), cnt in self.counts.items():
+            rule_key = tuple((s, mapping.get(region, region) if s == sensor else region) for s, region in rule_key)
+            remapped[(rule_key, label)] += cnt
+        self.counts = remapped
+
+
+def _clip_to_edge_regions(sensor_sets, column):
+    # Readings outside the universe have zero membership in every region, so assign_regions
+    # would count them in the first one; move them to the peak of the nearest edge region
+    peaks = list(_region_peaks(sensor_sets).values())
+    if not peaks:
+        return column
+    lo, hi = universe_bounds(sensor_sets)
+    return np.where(column < lo, min(peaks), np.where(column > hi, max(peaks), column))
+
+
+def _region_peaks(sensor_sets):
+    # Position of each region's peak: the triangle's b, or the argmax of a sampled MF
+    if is_analytic(sensor_sets):
+        return {name: abc[1] for name, abc in sensor_sets['trimf'].items()}
+    x = sensor_sets['universe']
+    return {name: float(x[np.argmax(sensor_sets[name])]) for name in region_names(sensor_sets)}
@@ -1,22 +1,38 @@
-import skfuzzy.fuzzymath.fuzzy_ops as fuzzy_ops
+import logging
+import time
+import numpy as np
+from fuzzy import instrumentation
+from fuzzy.membership import membership, memberships, region_names, trimf
+from fuzzy.rule_compiler import compile_rules, compiled_rule
+
+# Candidate rules are scored in blocks of this size, checking the early-stop bound between blocks
+CANDIDATE_BLOCK_SIZE = 64
+
+# diagnose_batch: bytes allowed for its two (rows x rules) float arrays, and most rows per chunk
+BATCH_MEMORY_BYTES = 256 * 2 ** 20
+MAX_BATCH_CHUNK_ROWS = 65536
+
+logger = logging.getLogger(__name__)
 
 
 def diagnose(reading, fuzzy_sets, rules, threshold=0.4): # 0.01
+    if isinstance(rules, dict): # compiled rule base, see fuzzy.rule_compiler.compile_rules
+        return _diagnose_compiled(reading, fuzzy_sets, rules, threshold)
+
+    observed = bool(instrumentation.sinks) # timers are only read when a sink is attached
+    if observed:
+        t_start = time.perf_counter()
+
     # precompute region memberships
     mems = {}
     for sensor, value in reading.items():
-        if sensor not in fuzzy_sets or not isinstance(fuzzy_sets[sensor], dict) or 'universe' not in fuzzy_sets[sensor]:
+        names = region_names(fuzzy_sets.get(sensor))
+        if not names:
             # print(f"Warning: Fuzzy set data for sensor '{sensor}' is incomplete or missing. Skipping.")
             continue # Skip this sensor if its fuzzy set data is problematic
-        x = fuzzy_sets[sensor]['universe']
-        mfs_for_sensor = {}
-        for name, mf in fuzzy_sets[sensor].items():
-            if name != 'universe':
-                if mf is not None and len(mf) == len(x):
-                     mfs_for_sensor[name] = fuzzy_ops.interp_membership(x, mf, value)
-                # else:
-                    # print(f"Warning: MF '{name}' for sensor '{sensor}' is invalid or mismatched. Skipping membership calculation.")
-        mems[sensor] = mfs_for_sensor
+        mems[sensor] = {name: membership(fuzzy_sets[sensor], name, value) for name in names}
+    if observed:
+        t_mems = time.perf_counter()
     
     highest_firing_strength = -1.0
     candidate_rule_details = None
@@ -55,6 +71,13 @@ def diagnose(reading, fuzzy_sets, rules, threshold=0.4): # 0.01
                 'original_rule_priority': rule.get('priority', 'N/A')
             }
 
+    result = _diagnosis_result(candidate_rule_details, highest_firing_strength, threshold)
+    if observed:
+        _emit_diagnosis(result, len(rules), 0, t_start, t_mems)
+    return result
+
+
+def _diagnosis_result(candidate_rule_details, highest_firing_strength, threshold):
     if candidate_rule_details is not None and highest_firing_strength >= threshold:
         return {
             'diagnosed_consequent': candidate_rule_details['consequent'],
@@ -67,19 +90,264 @@ def diagnose(reading, fuzzy_sets, rules, threshold=0.4): # 0.01
         confidence_str = f"{confidence_val:.2f}" if isinstance(confidence_val, float) else str(confidence_val)
         support_str = f"{support_val:.2f}" if isinstance(support_val, float) else str(support_val)
         
-        print(f"No rule fired above threshold {threshold}. "
-              f"Max strength rule: IF {candidate_rule_details['antecedent']} THEN {candidate_rule_details['consequent']} "
-              f"(RuleConf: {confidence_str}, Supp: {support_str}, "
-              f"FiringStrength: {highest_firing_strength:.4f})")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"No rule fired above threshold {threshold}. "
+                         f"Max strength rule: IF {candidate_rule_details['antecedent']} THEN {candidate_rule_details['consequent']} "
+                         f"(RuleConf: {confidence_str}, Supp: {support_str}, "
+                         f"FiringStrength: {highest_firing_strength:.4f})")
         return {
             'diagnosed_consequent': None,
             'activated_rule_info': candidate_rule_details,
             'status': 'below_threshold'
         }
     else:
-        print(f"No rule fired above threshold {threshold}. No rules were applicable or all had zero strength.")
+        logger.debug("No rule fired above threshold %s. No rules were applicable or all had zero strength.", threshold)
         return {
             'diagnosed_consequent': None,
             'activated_rule_info': None,
             'status': 'no_applicable_rules'
         }
+
+
+def _emit_diagnosis(result, rules_evaluated, rules_skipped, t_start, t_mems):
+    # one 'diagnose' event per call, see fuzzy.instrumentation
+    t_end = time.perf_counter()
+    info = result['activated_rule_info']
+    instrumentation.emit('diagnose', status=result['status'], consequent=result['diagnosed_consequent'],
+                         firing_strength=None if info is None else float(info['firing_strength']),
+                         rules_evaluated=rules_evaluated, rules_skipped=rules_skipped,
+                         membership_seconds=t_mems - t_start, rule_scan_seconds=t_end - t_mems)
+
+
+def _membership_tensor(compiled, fuzzy_sets, columns, n_rows):
+    """
+    Builds the (rows x sensors x regions+2) membership tensor for a compiled rule base.
+
+    columns maps a compiled sensor index to its array of readings; sensors without a column
+    keep zero membership everywhere, like a sensor missing from a reading in diagnose, and
+    so do NaN readings. The last two region columns are always 0 and 1, so an antecedent
+    code of -1 (sensor not in the rule) selects a neutral 1 under the min t-norm.
+    """
+    names = compiled['region_names']
+    breakpoints = compiled['breakpoints']
+    mems = np.zeros((n_rows, len(names), breakpoints.shape[1] + 2))
+    mems[:, :, -1] = 1.0
+
+    # Analytic sensors are evaluated together; NaN readings and NaN breakpoints give 0
+    analytic = [i for i in columns if compiled['analytic'][i]]
+    if analytic:
+        x = np.full((n_rows, len(names)), np.nan)
+        for i in analytic:
+            x[:, i] = columns[i]
+        mems[:, :, :-2] = trimf(x[:, :, None], np.moveaxis(breakpoints, -1, 0))
+    for i, values in columns.items():
+        if not compiled['analytic'][i]:
+            n_valid = compiled['n_regions'][i]
+            degrees = memberships(fuzzy_sets[compiled['sensors'][i]], names[i][:n_valid], values)
+            degrees[np.isnan(values)] = 0.0
+            mems[:, i, :n_valid] = degrees
+    return mems
+
+
+def _diagnose_compiled(reading, fuzzy_sets, compiled, threshold, mems=None):
+    """
+    diagnose() for a compiled rule base.
+
+    mems, if given, is the reading's precomputed (sensors x regions+2) membership row, laid
+    out as by _membership_tensor; reading and fuzzy_sets are then not used.
+
+    Only rules whose (sensor, region) pairs all have non-zero membership can beat the zero
+    strength of the first rule, so the inverted index is used to find those candidates and
+    only they are scored, in priority order. The scan stops once a rule reaches the upper
+    bound set by the sensors every rule shares. Winner and tie-breaking match the full scan.
+    """
+    observed = bool(instrumentation.sinks)
+    if observed:
+        t_start = time.perf_counter()
+    n_rules = len(compiled['consequents'])
+    if n_rules == 0:
+        result = _diagnosis_result(None, -1.0, threshold)
+        if observed:
+            _emit_diagnosis(result, 0, 0, t_start, t_start)
+        return result
+
+    if mems is None:
+        columns = {i: np.array([reading[sensor]], dtype=float)
+                   for i, sensor in enumerate(compiled['sensors'])
+                   if sensor in reading and compiled['n_regions'][i] > 0}
+        mems = _membership_tensor(compiled, fuzzy_sets, columns, 1)[0]
+    if observed:
+        t_mems = time.perf_counter()
+
+    index_offsets, index_rules = compiled['index_offsets'], compiled['index_rules']
+    hit_lists = []
+    for i in np.flatnonzero(compiled['n_regions'] > 0): # missing sensors have no non-zero membership
+        for pair in compiled['pair_offsets'][i] + np.flatnonzero(mems[i, :compiled['n_regions'][i]] > 0):
+            hit_lists.append(index_rules[index_offsets[pair]:index_offsets[pair + 1]])
+    sizes = compiled['antecedent_sizes']
+    hits = np.bincount(np.concatenate(hit_lists), minlength=n_rules) if hit_lists else np.zeros(n_rules, dtype=np.intp)
+    candidates = np.flatnonzero((hits == sizes) & (sizes > 0))
+
+    shared = compiled['shared_sensors']
+    bound = mems[shared, :-2].max(axis=1).min() if shared.size else 1.0
+    sensor_ids = np.arange(mems.shape[0])
+    best_rule, best_strength = 0, 0.0 # every rule has zero strength unless it is a candidate
+    evaluated = 0
+    for start in range(0, len(candidates), CANDIDATE_BLOCK_SIZE):
+        block = candidates[start:start + CANDIDATE_BLOCK_SIZE]
+        strengths = mems[sensor_ids, compiled['antecedents'][block]].min(axis=1)
+        evaluated += len(block)
+        j = np.argmax(strengths)
+        if strengths[j] > best_strength:
+            best_rule, best_strength = block[j], strengths[j]
+        if best_strength >= bound:
+            break
+
+    rule = compiled_rule(compiled, best_rule)
+    candidate_rule_details = {
+        'antecedent': rule['antecedent'],
+        'consequent': rule['consequent'],
+        'confidence': rule.get('confidence', 'N/A'),
+        'support': rule.get('support', 'N/A'),
+        'firing_strength': best_strength,
+        'original_rule_priority': rule.get('priority', 'N/A')
+    }
+    result = _diagnosis_result(candidate_rule_details, best_strength, threshold)
+    if observed:
+        _emit_diagnosis(result, evaluated, n_rules - evaluated, t_start, t_mems)
+    return result
+
+
+def _column_map(compiled, sensors):
+    # compiled sensor index -> column of `sensors`, for the sensors that have fuzzy sets
+    sensor_index = {sensor: i for i, sensor in enumerate(compiled['sensors'])}
+    return {sensor_index[sensor]: k for k, sensor in enumerate(sensors)
+            if sensor in sensor_index and compiled['n_regions'][sensor_index[sensor]] > 0}
+
+
+def _strength_codes(compiled):
+    # antecedent codes for _rule_strengths; empty antecedents select the zero column
+    codes = compiled['antecedents'].copy()
+    width = max((len(names) for names in compiled['region_names']), default=0)
+    codes[compiled['antecedent_sizes'] == 0, :] = width
+    return codes
+
+
+def _rule_strengths(mems, codes, out=None, buffer=None):
+    """
+    (rows x rules) firing strengths under the min t-norm, from a _membership_tensor.
+
+    Each sensor's memberships are gathered into buffer and folded into out, so scoring
+    needs exactly two (rows x rules) arrays; both are allocated if not given.
+    """
+    if out is None:
+        out = np.empty((mems.shape[0], codes.shape[0]))
+    if not codes.shape[1]:
+        out[:] = 0.0
+        return out
+    np.take(mems[:, 0, :], codes[:, 0], axis=1, out=out, mode='clip') # 'clip' writes out unbuffered
+    if codes.shape[1] > 1 and buffer is None:
+        buffer = np.empty_like(out)
+    for i in range(1, codes.shape[1]):
+        np.take(mems[:, i, :], codes[:, i], axis=1, out=buffer, mode='clip')
+        np.minimum(out, buffer, out=out)
+    return out
+
+
+def diagnose_batch(data, fuzzy_sets, rules, threshold=0.4, sensors=None, chunk_size=None):
+    """
+    Diagnoses many readings at once using NumPy array operations.
+
+    Produces, row for row, the same winner, firing strength and status as `diagnose`.
+
+    Args:
+        data (pd.DataFrame or np.ndarray): One reading per row. DataFrame columns are matched
+            by sensor name; ndarray columns are taken in the order of `sensors`. A NaN value
+            is treated like a sensor missing from the reading in diagnose.
+        fuzzy_sets (dict): Fuzzy set data per sensor, as returned by auto_partition.
+        rules (list of dict or dict): Rules sorted by priority, as returned by generate_rules,
+            or a rule base compiled with compile_rules.
+        threshold (float, optional): Minimum firing strength for a diagnosis. Defaults to 0.4.
+        sensors (list of str, optional): Sensor names of the columns to score. Defaults to the
+            DataFrame's columns that have fuzzy sets, or to the keys of fuzzy_sets for an ndarray.
+        chunk_size (int, optional): Number of rows scored per pass. Each pass holds two
+            (rows x rules) float arrays, so the default is the most rows that fit them into
+            BATCH_MEMORY_BYTES, at most MAX_BATCH_CHUNK_ROWS.
+
+    Returns:
+        dict: Columnar results, one entry per row:
+              'diagnosed_consequent' (object array, None where no diagnosis was made),
+              'rule_index' (int array, index into `rules` of the strongest rule, -1 if none),
+              'firing_strength' (float array, NaN if no rule applied),
+              'status' (object array of 'threshold_met' / 'below_threshold' / 'no_applicable_rules').
+    """
+    if hasattr(data, 'columns'):
+        if sensors is None:
+            sensors = [s for s in data.columns if s in fuzzy_sets]
+        values = data[list(sensors)].to_numpy(dtype=float)
+    else:
+        if sensors is None:
+            sensors = list(fuzzy_sets.keys())
+        values = np.asarray(data, dtype=float)
+        if values.ndim != 2 or values.shape[1] != len(sensors):
+            raise ValueError("data must be a 2-D array with one column per sensor")
+
+    n_rows = values.shape[0]
+    consequents = np.full(n_rows, None, dtype=object)
+    rule_index = np.full(n_rows, -1, dtype=np.intp)
+    firing_strength = np.full(n_rows, np.nan)
+    status = np.full(n_rows, 'no_applicable_rules', dtype=object)
+
+    compiled = rules if isinstance(rules, dict) else compile_rules(rules, fuzzy_sets)
+    n_rules = len(compiled['consequents'])
+    if n_rules == 0 or n_rows == 0:
+        if instrumentation.sinks:
+            instrumentation.emit('diagnose_batch', rows=n_rows, status_counts={'no_applicable_rules': n_rows},
+                                 firing_strength_histogram=instrumentation.strength_histogram(firing_strength),
+                                 rules_evaluated=0, rules_skipped=0, membership_seconds=0.0, rule_scan_seconds=0.0)
+        return {'diagnosed_consequent': consequents, 'rule_index': rule_index,
+                'firing_strength': firing_strength, 'status': status}
+
+    observed = bool(instrumentation.sinks)
+    membership_seconds = scan_seconds = 0.0
+    column_of = _column_map(compiled, sensors)
+    codes = _strength_codes(compiled)
+    label_array = np.empty(len(compiled['labels']), dtype=object)
+    label_array[:] = compiled['labels']
+    if chunk_size is None:
+        chunk_size = max(1, min(MAX_BATCH_CHUNK_ROWS, BATCH_MEMORY_BYTES // (16 * n_rules)))
+    chunk_rows = min(chunk_size, n_rows)
+    out = np.empty((chunk_rows, n_rules))
+    buffer = np.empty((chunk_rows, n_rules)) if codes.shape[1] > 1 else None
+
+    for start in range(0, n_rows, chunk_size):
+        stop = min(start + chunk_size, n_rows)
+        n = stop - start
+        columns = {i: values[start:stop, k] for i, k in column_of.items()}
+        if observed:
+            t_start = time.perf_counter()
+        mems = _membership_tensor(compiled, fuzzy_sets, columns, n)
+        if observed:
+            t_mems = time.perf_counter()
+        # rules are pre-sorted by priority, and argmax keeps the first maximum, matching
+        # the strict '>' scan in diagnose
+        strengths = _rule_strengths(mems, codes, out[:n], None if buffer is None else buffer[:n])
+        best = np.argmax(strengths, axis=1)
+        rule_index[start:stop] = best
+        firing_strength[start:stop] = strengths[np.arange(n), best]
+        if observed:
+            membership_seconds += t_mems - t_start
+            scan_seconds += time.perf_counter() - t_mems
+
+    met = firing_strength >= threshold
+    status[:] = np.where(met, 'threshold_met', 'below_threshold')
+    consequents[met] = label_array[compiled['consequents'][rule_index[met]]]
+    if observed:
+        n_met = int(met.sum())
+        instrumentation.emit('diagnose_batch', rows=n_rows,
+                             status_counts={'threshold_met': n_met, 'below_threshold': n_rows - n_met},
+                             firing_strength_histogram=instrumentation.strength_histogram(firing_strength),
+                             rules_evaluated=n_rows * n_rules, rules_skipped=0,
+                             membership_seconds=membership_seconds, rule_scan_seconds=scan_seconds)
+    return {'diagnosed_consequent': consequents, 'rule_index': rule_index,
+            'firing_strength': firing_strength, 'status': status}
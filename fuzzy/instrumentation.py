@@ -0,0 +1,136 @@
+"""
+Pluggable instrumentation for inference and training.
+
+Instrumented functions report one event per call to every attached sink, a callable
+``sink(event, fields)``. Events and their fields:
+
+    'diagnose'        status, consequent, firing_strength, rules_evaluated, rules_skipped,
+                      membership_seconds, rule_scan_seconds
+    'diagnose_batch'  rows, status_counts, firing_strength_histogram, rules_evaluated,
+                      rules_skipped, membership_seconds, rule_scan_seconds
+    'generate_rules'  rows, rules, counting_seconds, rule_building_seconds
+    'train_from_csv'  rows, rules, scan_seconds, partition_seconds, counting_seconds
+    'train_parallel'  rows, rules, partition_seconds, counting_seconds
+    'render_activation_reports'
+                      plots, fmt, n_workers, render_seconds, plots_per_second
+
+firing_strength_histogram counts winning firing strengths in the STRENGTH_BINS intervals.
+When no sink is attached, instrumented code only checks that `sinks` is empty: no timers
+are read and no event is built.
+"""
+import json
+import logging
+import numpy as np
+
+# Bin edges for histograms of winning firing strength
+STRENGTH_BINS = np.linspace(0.0, 1.0, 11)
+
+# Attached sinks; instrumented code tests this list before doing any instrumentation work
+sinks = []
+
+
+def add_sink(sink):
+    """Attaches a sink, a callable sink(event, fields). Returns the sink."""
+    sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink):
+    """Detaches a sink previously attached with add_sink."""
+    sinks.remove(sink)
+
+
+def clear_sinks():
+    """Detaches all sinks."""
+    sinks.clear()
+
+
+def emit(event, **fields):
+    """Sends an event to every attached sink."""
+    for sink in sinks:
+        sink(event, fields)
+
+
+def strength_histogram(strengths):
+    """Counts of firing strengths per STRENGTH_BINS interval (NaNs are ignored)."""
+    strengths = np.asarray(strengths, dtype=float)
+    return np.histogram(strengths[~np.isnan(strengths)], bins=STRENGTH_BINS)[0].tolist()
+
+
+class MetricsRecorder:
+    """
+    Sink that aggregates events into counters, timers and histograms.
+
+    Counters count calls, outcome statuses and rules evaluated/skipped per event; timers
+    accumulate every '*_seconds' field as count/total/max; the 'firing_strength' histogram
+    collects winning firing strengths over STRENGTH_BINS.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Clears all recorded metrics."""
+        self.counters = {}
+        self.timers = {}
+        self.histograms = {}
+
+    def __call__(self, event, fields):
+        self._count(f'{event}.calls')
+        for name, value in fields.items():
+            if name.endswith('_seconds'):
+                timer = self.timers.setdefault(f'{event}.{name[:-len("_seconds")]}', {'count': 0, 'total': 0.0, 'max': 0.0})
+                timer['count'] += 1
+                timer['total'] += value
+                timer['max'] = max(timer['max'], value)
+            elif name == 'status':
+                self._count(f'{event}.status.{value}')
+            elif name == 'status_counts':
+                for status, n in value.items():
+                    self._count(f'{event}.status.{status}', n)
+            elif name in ('rules_evaluated', 'rules_skipped', 'rows'):
+                self._count(f'{event}.{name}', value)
+            elif name == 'firing_strength' and value is not None:
+                self._histogram(f'{event}.firing_strength')[
+                    min(np.searchsorted(STRENGTH_BINS, value, side='right') - 1, len(STRENGTH_BINS) - 2)] += 1
+            elif name == 'firing_strength_histogram':
+                hist = self._histogram(f'{event}.firing_strength')
+                for i, n in enumerate(value):
+                    hist[i] += n
+
+    def _count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def _histogram(self, name):
+        return self.histograms.setdefault(name, [0] * (len(STRENGTH_BINS) - 1))
+
+    def snapshot(self):
+        """Returns a copy of the metrics as plain dicts (JSON serializable)."""
+        return {
+            'counters': dict(self.counters),
+            'timers': {name: dict(timer) for name, timer in self.timers.items()},
+            'histograms': {name: {'bin_edges': STRENGTH_BINS.tolist(), 'counts': list(counts)}
+                           for name, counts in self.histograms.items()},
+        }
+
+
+class LoggingSink:
+    """
+    Sink that writes each event as one structured log record.
+
+    The message is the event name followed by its fields as JSON; the record also carries
+    them as the `fuzzy_event` and `fuzzy_fields` attributes for structured log handlers.
+
+    Args:
+        logger (logging.Logger, optional): Target logger. Defaults to the 'fuzzy' logger.
+        level (int, optional): Log level of the records. Defaults to logging.DEBUG.
+    """
+
+    def __init__(self, logger=None, level=logging.DEBUG):
+        self.logger = logger if logger is not None else logging.getLogger('fuzzy')
+        self.level = level
+
+    def __call__(self, event, fields):
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, "%s %s", event, json.dumps(fields, default=str),
+                            extra={'fuzzy_event': event, 'fuzzy_fields': fields})
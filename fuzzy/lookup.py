@@ -0,0 +1,195 @@
+import math
+from collections import OrderedDict
+import numpy as np
+from fuzzy.inference_engine import _diagnose_compiled
+from fuzzy.membership import is_analytic, memberships, region_names, universe_bounds
+from fuzzy.rule_compiler import compile_rules
+
+# Default number of diagnosis results kept by CachedDiagnoser
+DEFAULT_CACHE_SIZE = 4096
+
+
+def quantization_error_bound(sensor_sets, step):
+    """
+    Largest membership error from evaluating a sensor's MFs at the nearest grid point.
+
+    A reading inside the universe moves by at most step / 2, and outside it the membership
+    is exactly 0 either way. The error is therefore at most the steepest MF slope times
+    step / 2, capped at 1. A triangle with a zero-width side inside the universe jumps
+    between 0 and 1, so it gives the cap.
+
+    Args:
+        sensor_sets (dict): Fuzzy set data of one sensor, in either representation.
+        step (float): Quantization step.
+
+    Returns:
+        float: Bound on |membership(x) - membership(grid point of x)| over all regions.
+    """
+    names = region_names(sensor_sets)
+    if not names:
+        return 0.0
+    if is_analytic(sensor_sets):
+        lo, hi = universe_bounds(sensor_sets)
+        slope = 0.0
+        for name in names:
+            a, b, c = sensor_sets['trimf'][name]
+            if a == c or (a == b and lo < b) or (b == c and b < hi):
+                return 1.0
+            slope = max(slope, *(1.0 / width for width in (b - a, c - b) if width > 0))
+    else:
+        dx = np.diff(sensor_sets['universe'])
+        steps = dx > 0
+        slope = max(float(np.max(np.abs(np.diff(sensor_sets[name]))[steps] / dx[steps], initial=0.0))
+                    for name in names)
+    return min(1.0, slope * step / 2.0)
+
+
+def build_lookup_tables(fuzzy_sets, step, sensors=None):
+    """
+    Precomputes per-sensor membership tables on a grid with the given step.
+
+    The grid starts at the lower bound of the sensor's universe and its last point is
+    clipped to the upper bound. Readings are looked up at their nearest grid point (see
+    lookup_memberships), and readings outside the universe get zero membership.
+
+    Args:
+        fuzzy_sets (dict): Fuzzy set data per sensor, in either representation.
+        step (float or dict): Quantization step, or a step per sensor (e.g. the resolution
+            each sensor reports at).
+        sensors (list of str, optional): Sensors to tabulate. Defaults to all of fuzzy_sets.
+
+    Returns:
+        dict: sensor -> {'bounds': (lo, hi), 'step': float, 'names': region names,
+              'table': (grid points x regions) array, 'max_error': quantization_error_bound}.
+              Sensors without usable fuzzy sets are left out.
+    """
+    if sensors is None:
+        sensors = list(fuzzy_sets.keys())
+    tables = {}
+    for sensor in sensors:
+        sensor_sets = fuzzy_sets.get(sensor)
+        names = region_names(sensor_sets)
+        if not names:
+            continue
+        sensor_step = float(step[sensor] if isinstance(step, dict) else step)
+        if not sensor_step > 0:
+            raise ValueError(f"Quantization step for sensor '{sensor}' must be positive")
+        lo, hi = (float(v) for v in universe_bounds(sensor_sets))
+        n_steps = max(int(math.ceil((hi - lo) / sensor_step)), 0)
+        grid = np.minimum(lo + sensor_step * np.arange(n_steps + 1), hi)
+        tables[sensor] = {
+            'bounds': (lo, hi),
+            'step': sensor_step,
+            'names': names,
+            'table': memberships(sensor_sets, names, grid),
+            'max_error': quantization_error_bound(sensor_sets, sensor_step),
+        }
+    return tables
+
+
+def _grid_index(entry, value):
+    # Nearest grid row of one reading, -1 if it is missing or outside the universe
+    lo, hi = entry['bounds']
+    if value is None or not lo <= value <= hi: # also False for NaN
+        return -1
+    return min(int(round((value - lo) / entry['step'])), len(entry['table']) - 1)
+
+
+def lookup_memberships(entry, values):
+    """
+    Membership degrees of readings from one sensor's lookup table.
+
+    Args:
+        entry (dict): One sensor's entry from build_lookup_tables.
+        values (np.ndarray): 1-D array of readings.
+
+    Returns:
+        np.ndarray: Array of shape (len(values), len(entry['names'])), within
+                    entry['max_error'] of memberships() on the exact readings.
+    """
+    values = np.asarray(values, dtype=float)
+    lo, hi = entry['bounds']
+    table = entry['table']
+    inside = (values >= lo) & (values <= hi)
+    rows = np.zeros(len(values), dtype=np.intp)
+    rows[inside] = np.minimum(np.rint((values[inside] - lo) / entry['step']).astype(np.intp), len(table) - 1)
+    return np.where(inside[:, None], table[rows], 0.0)
+
+
+class CachedDiagnoser:
+    """
+    diagnose() with quantized membership tables and an LRU cache of results.
+
+    Each reading is snapped to the lookup-table grid of every sensor. The grid indices
+    form the cache key, so repeated or nearly repeated readings (within half a step on
+    every sensor) are answered from the cache. On a miss, the memberships come from the
+    tables and the compiled rule base is scanned as in diagnose.
+
+    Quantization error: every membership is within the sensor's quantization_error_bound
+    (slope * step / 2), and the min t-norm does not increase it. So each firing strength is
+    within `max_error` of the exact one. The diagnosis can only differ from diagnose when
+    the best two rules are within 2 * max_error of each other, or the winning strength is
+    within max_error of the threshold.
+
+    Returned result dicts are shared with the cache and must not be modified.
+
+    Args:
+        fuzzy_sets (dict): Fuzzy set data per sensor.
+        rules (list of dict or dict): Rules sorted by priority, or a compiled rule base.
+        step (float or dict): Quantization step, or a step per sensor.
+        threshold (float, optional): Minimum firing strength for a diagnosis. Defaults to 0.4.
+        maxsize (int, optional): Most results kept in the cache. Defaults to DEFAULT_CACHE_SIZE.
+    """
+
+    def __init__(self, fuzzy_sets, rules, step, threshold=0.4, maxsize=DEFAULT_CACHE_SIZE):
+        self.fuzzy_sets = fuzzy_sets
+        self.compiled = rules if isinstance(rules, dict) else compile_rules(rules, fuzzy_sets)
+        self.threshold = threshold
+        self.maxsize = maxsize
+        sensors = [s for i, s in enumerate(self.compiled['sensors']) if self.compiled['n_regions'][i] > 0]
+        self.tables = build_lookup_tables(fuzzy_sets, step, sensors=sensors)
+        self.max_error = max((entry['max_error'] for entry in self.tables.values()), default=0.0)
+        self._slots = [(i, sensor, self.tables[sensor]) for i, sensor in enumerate(self.compiled['sensors'])
+                       if sensor in self.tables]
+        width = self.compiled['breakpoints'].shape[1]
+        self._empty = np.zeros((len(self.compiled['sensors']), width + 2))
+        self._empty[:, -1] = 1.0
+        self._cache = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+
+    def diagnose(self, reading):
+        """Same result as diagnose(reading, fuzzy_sets, rules, threshold), up to quantization."""
+        key = tuple(_grid_index(entry, reading.get(sensor)) for _, sensor, entry in self._slots)
+        result = self._cache.get(key)
+        if result is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return result
+        self.misses += 1
+        mems = self._empty.copy()
+        for (i, _, entry), row in zip(self._slots, key):
+            if row >= 0:
+                mems[i, :len(entry['names'])] = entry['table'][row]
+        result = _diagnose_compiled(reading, self.fuzzy_sets, self.compiled, self.threshold, mems=mems)
+        self._cache[key] = result
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+        return result
+
+    def stats(self):
+        """Cache hit/miss statistics."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._cache),
+            'maxsize': self.maxsize,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        """Empties the cache and resets the statistics."""
+        self._cache.clear()
+        self.hits = self.misses = self.evictions = 0
@@ -0,0 +1,116 @@
+import numpy as np
+
+# Fuzzy set data for one sensor comes in two representations:
+#   sampled:  {'universe': x, 'low': mf_array, ...}            (MFs sampled on the universe grid)
+#   analytic: {'bounds': (lo, hi), 'trimf': {'low': (a, b, c), ...}}   (triangle breakpoints only)
+# The helpers below accept either, so callers never need to know which one they hold.
+
+
+def trimf(x, abc):
+    """
+    Evaluates a triangular membership function in closed form.
+
+    Matches skfuzzy.membership.trimf point for point: 0 at and outside a and c, 1 at b,
+    linear in between. a, b and c may also be arrays, in which case they broadcast
+    against x, e.g. x[:, None] against the breakpoints of several triangles.
+
+    Args:
+        x (float or np.ndarray): Input value(s).
+        abc (sequence): Breakpoints a <= b <= c (floats or arrays).
+
+    Returns:
+        np.ndarray: Membership degrees, broadcast shape of x and the breakpoints.
+    """
+    a, b, c = abc
+    x = np.asarray(x, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'): # a == b or b == c gives an empty side
+        y = np.where((a < x) & (x < b), (x - a) / np.subtract(b, a, dtype=float), 0.0)
+        y = np.where((b < x) & (x < c), (c - x) / np.subtract(c, b, dtype=float), y)
+    return np.where(x == b, 1.0, y)
+
+
+def is_analytic(sensor_sets):
+    """True if the fuzzy set data holds triangle breakpoints rather than sampled arrays."""
+    return isinstance(sensor_sets, dict) and 'trimf' in sensor_sets
+
+
+def region_names(sensor_sets):
+    """
+    Lists the regions of a sensor that have a usable membership function.
+
+    Returns an empty list if the fuzzy set data is missing or incomplete.
+    """
+    if is_analytic(sensor_sets):
+        return list(sensor_sets['trimf'].keys())
+    if not isinstance(sensor_sets, dict) or 'universe' not in sensor_sets:
+        return []
+    x = sensor_sets['universe']
+    return [name for name, mf in sensor_sets.items()
+            if name != 'universe' and mf is not None and len(mf) == len(x)]
+
+
+def membership(sensor_sets, region, values):
+    """
+    Membership degree(s) of values in one region of a sensor.
+
+    Sampled MFs are linearly interpolated and are 0 outside the universe, exactly as
+    skfuzzy's interp_membership; analytic MFs are evaluated in closed form.
+
+    Args:
+        sensor_sets (dict): Fuzzy set data of one sensor, in either representation.
+        region (str): Region name; must be one of region_names(sensor_sets).
+        values (float or np.ndarray): Sensor reading(s).
+
+    Returns:
+        float or np.ndarray: Membership degree(s), shaped like values.
+    """
+    if is_analytic(sensor_sets):
+        degrees = trimf(values, sensor_sets['trimf'][region])
+        return degrees if degrees.ndim else degrees[()]
+    return np.interp(values, sensor_sets['universe'], sensor_sets[region], left=0.0, right=0.0)
+
+
+def memberships(sensor_sets, names, values):
+    """
+    Membership degrees of values in several regions of a sensor at once.
+
+    Args:
+        sensor_sets (dict): Fuzzy set data of one sensor, in either representation.
+        names (list of str): Region names, each one of region_names(sensor_sets).
+        values (np.ndarray): 1-D array of sensor readings.
+
+    Returns:
+        np.ndarray: Array of shape (len(values), len(names)).
+    """
+    values = np.asarray(values, dtype=float)
+    if is_analytic(sensor_sets):
+        abc = np.array([sensor_sets['trimf'][name] for name in names], dtype=float).reshape(-1, 3)
+        return trimf(values[:, None], abc.T)
+    degrees = np.empty((len(values), len(names)))
+    for j, name in enumerate(names):
+        degrees[:, j] = membership(sensor_sets, name, values)
+    return degrees
+
+
+def universe_bounds(sensor_sets):
+    """Returns the (min, max) of a sensor's universe of discourse."""
+    if is_analytic(sensor_sets):
+        return tuple(sensor_sets['bounds'])
+    x = sensor_sets['universe']
+    return x[0], x[-1]
+
+
+def to_sampled(sensor_sets, universe_size=500):
+    """
+    Returns the sampled representation of a sensor's fuzzy sets.
+
+    Analytic sets are sampled on a universe_size-point grid over their bounds; sampled
+    sets are returned unchanged. Used where the arrays themselves are needed, e.g. plotting.
+    """
+    if not is_analytic(sensor_sets):
+        return sensor_sets
+    x = np.linspace(*sensor_sets['bounds'], universe_size)
+    sampled = {'universe': x}
+    for name, abc in sensor_sets['trimf'].items():
+        sampled[name] = trimf(x, abc)
+    return sampled
@@ -0,0 +1,194 @@
+import json
+import os
+import struct
+import numpy as np
+from fuzzy.membership import is_analytic
+from fuzzy.rule_compiler import compile_rules
+
+# File layout: MAGIC, header struct (format version, JSON header length), JSON header,
+# then the raw arrays, each starting on an ALIGNMENT-byte boundary so they can be memory-mapped.
+MAGIC = b'FZYMODEL'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_HEADER = struct.Struct('<IQ')
+
+# Compiled rule base arrays written as-is, with their on-disk dtype
+_COMPILED_ARRAYS = {
+    'n_regions': '<i8',
+    'antecedents': '<i8',
+    'antecedent_sizes': '<i8',
+    'consequents': '<i8',
+    'support': '<f8',
+    'confidence': '<f8',
+    'priority': '<f8',
+    'pair_offsets': '<i8',
+    'index_offsets': '<i8',
+    'index_rules': '<i8',
+    'shared_sensors': '<i8',
+    'analytic': '|b1',
+    'breakpoints': '<f8',
+}
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def save_model(path, fuzzy_sets, rules):
+    """
+    Saves a trained model as a versioned binary file that load_model can memory-map.
+
+    Args:
+        path (str): Output file path. The file is written to a temporary name and renamed,
+            so readers never see a partial model.
+        fuzzy_sets (dict): Fuzzy set data per sensor, as returned by auto_partition.
+        rules (list of dict or dict): Rules sorted by priority, or a rule base compiled with
+            compile_rules against the same fuzzy_sets.
+    """
+    compiled = rules if isinstance(rules, dict) else compile_rules(rules, fuzzy_sets)
+    arrays = {name: np.ascontiguousarray(compiled[name], dtype=dtype) for name, dtype in _COMPILED_ARRAYS.items()}
+
+    sets_meta = []
+    for i, sensor in enumerate(compiled['sensors']):
+        sensor_sets = fuzzy_sets.get(sensor)
+        n_valid = int(compiled['n_regions'][i])
+        if n_valid == 0:
+            sets_meta.append({'kind': 'missing'})
+        elif is_analytic(sensor_sets):
+            sets_meta.append({'kind': 'analytic', 'bounds': [float(v) for v in sensor_sets['bounds']]})
+        else:
+            sets_meta.append({'kind': 'sampled'})
+            arrays[f'universe/{i}'] = np.ascontiguousarray(sensor_sets['universe'], dtype='<f8')
+            arrays[f'mfs/{i}'] = np.ascontiguousarray(
+                [sensor_sets[name] for name in compiled['region_names'][i][:n_valid]], dtype='<f8')
+
+    try:
+        labels = json.loads(json.dumps(compiled['labels']))
+    except TypeError as exc:
+        raise TypeError("rule consequents must be JSON serializable (str, int, float, bool or None)") from exc
+    if labels != compiled['labels']:
+        raise TypeError("rule consequents do not survive JSON serialization unchanged")
+
+    header = {
+        'format_version': FORMAT_VERSION,
+        'sensors': compiled['sensors'],
+        'region_names': compiled['region_names'],
+        'labels': labels,
+        'fuzzy_sets': sets_meta,
+        'arrays': {},
+    }
+    # Offsets are relative to the start of the data section, which follows the JSON header
+    offset = 0
+    for name, array in arrays.items():
+        header['arrays'][name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset = _aligned(offset + array.nbytes)
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = _aligned(len(MAGIC) + _HEADER.size + len(header_bytes))
+
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(_HEADER.pack(FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + header['arrays'][name]['offset'])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+
+def load_model(path, sensors=None):
+    """
+    Loads a model written by save_model, memory-mapping its arrays.
+
+    The arrays are read-only views on a shared file mapping, so any number of worker
+    processes can load the same file without copying it. Rule dicts are not rebuilt;
+    the compiled rule base is used directly by diagnose and diagnose_batch.
+
+    Args:
+        path (str): Model file path.
+        sensors (list of str, optional): Sensors the model will be scored against. If given,
+            every one of them must have fuzzy sets in the model and every sensor used by the
+            rules must be among them.
+
+    Returns:
+        tuple: (fuzzy_sets, compiled) where compiled is the rule base as from compile_rules
+               (without the source 'rules' list).
+
+    Raises:
+        ValueError: If the file is not a model file, has an unsupported format version, is
+            truncated or inconsistent, or does not match `sensors`.
+    """
+    with open(path, 'rb') as f:
+        prefix = f.read(len(MAGIC) + _HEADER.size)
+        if len(prefix) < len(MAGIC) + _HEADER.size or prefix[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"'{path}' is not a fuzzy model file")
+        version, header_length = _HEADER.unpack(prefix[len(MAGIC):])
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported model format version {version} (expected {FORMAT_VERSION})")
+        header = json.loads(f.read(header_length).decode('utf-8'))
+    data_start = _aligned(len(MAGIC) + _HEADER.size + header_length)
+
+    mapped = np.memmap(path, dtype=np.uint8, mode='r')
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        start = data_start + spec['offset']
+        if start + dtype.itemsize * int(np.prod(spec['shape'])) > len(mapped):
+            raise ValueError(f"Model file '{path}' is truncated (array '{name}')")
+        arrays[name] = np.ndarray(spec['shape'], dtype=dtype, buffer=mapped, offset=start)
+
+    compiled = {name: arrays[name] for name in _COMPILED_ARRAYS}
+    compiled.update(sensors=header['sensors'], region_names=header['region_names'],
+                    labels=header['labels'], rules=None)
+    _check_compiled(compiled, path)
+
+    fuzzy_sets = {}
+    for i, (sensor, meta) in enumerate(zip(header['sensors'], header['fuzzy_sets'])):
+        names = header['region_names'][i][:compiled['n_regions'][i]]
+        if meta['kind'] == 'analytic':
+            fuzzy_sets[sensor] = {'bounds': tuple(meta['bounds']),
+                                  'trimf': {name: tuple(compiled['breakpoints'][i, j].tolist())
+                                            for j, name in enumerate(names)}}
+        elif meta['kind'] == 'sampled':
+            sampled = {'universe': arrays[f'universe/{i}']}
+            sampled.update((name, arrays[f'mfs/{i}'][j]) for j, name in enumerate(names))
+            fuzzy_sets[sensor] = sampled
+
+    if sensors is not None:
+        check_model_sensors(fuzzy_sets, compiled, sensors)
+    return fuzzy_sets, compiled
+
+
+def _check_compiled(compiled, path):
+    # Cheap structural checks so a corrupt file fails at load time, not during scoring
+    n_sensors = len(compiled['sensors'])
+    n_rules = len(compiled['consequents'])
+    codes = compiled['antecedents']
+    if (codes.shape != (n_rules, n_sensors) or len(compiled['region_names']) != n_sensors
+            or len(compiled['n_regions']) != n_sensors or compiled['breakpoints'].shape[0] != n_sensors):
+        raise ValueError(f"Model file '{path}' is inconsistent: array shapes do not match the header")
+    widths = np.array([len(names) for names in compiled['region_names']], dtype=np.int64)
+    if n_rules and (codes.min(initial=-1) < -1 or (codes >= widths[None, :]).any()
+                    or compiled['consequents'].max(initial=-1) >= len(compiled['labels'])):
+        raise ValueError(f"Model file '{path}' is inconsistent: rule codes out of range")
+
+
+def check_model_sensors(fuzzy_sets, compiled, sensors):
+    """
+    Checks that a model can score readings with exactly these sensors.
+
+    Raises:
+        ValueError: If a sensor has no fuzzy sets in the model, or a rule uses a sensor
+            that is not in `sensors`.
+    """
+    missing = [s for s in sensors if s not in fuzzy_sets]
+    used = np.flatnonzero((compiled['antecedents'] >= 0).any(axis=0))
+    unscored = [compiled['sensors'][i] for i in used if compiled['sensors'][i] not in set(sensors)]
+    if missing or unscored:
+        problems = []
+        if missing:
+            problems.append(f"no fuzzy sets for {missing}")
+        if unscored:
+            problems.append(f"rules use sensors not being scored: {unscored}")
+        raise ValueError("Model does not match the sensor list: " + "; ".join(problems))
@@ -1,9 +1,10 @@
 import numpy as np
-from sklearn.cluster import KMeans
-import skfuzzy.membership as skm
+from fuzzy.clustering import DEFAULT_HISTOGRAM_BINS, cluster_centers
+from fuzzy.membership import to_sampled
 from fuzzy.sets import DEFAULT_NUM_SETS, DEFAULT_SET_NAMES, get_generic_set_names
 
-def auto_partition(data_series, num_sets=None, set_names=None, universe_size=500, random_state=42):
+def auto_partition(data_series, num_sets=None, set_names=None, universe_size=500, random_state=42,
+                   representation='analytic', value_range=None, method='kmeans', bins=DEFAULT_HISTOGRAM_BINS):
     """
     Automatically partitions a data series into fuzzy sets using k-means.
 
@@ -11,13 +12,27 @@ def auto_partition(data_series, num_sets=None, set_names=None, universe_size=500
         data_series (pd.Series): The input data series for a sensor.
         num_sets (int, optional): The number of fuzzy sets to create. Defaults to DEFAULT_NUM_SETS.
         set_names (list of str, optional): Names for the fuzzy sets. Auto-generated if None.
-        universe_size (int, optional): Number of points in the universe of discourse. Defaults to 500.
+        universe_size (int, optional): Number of points in the universe of discourse when
+            representation is 'sampled'. Defaults to 500.
         random_state (int, optional): Random state for KMeans for reproducibility. Defaults to 42.
+        representation (str, optional): 'analytic' to store only the triangle breakpoints, or
+            'sampled' to sample every MF on the universe grid. Defaults to 'analytic'.
+        value_range (tuple of float, optional): (min, max) of the full data when data_series is
+            only a sample of it, e.g. when training from a stream. Defaults to the range of data_series.
+        method (str, optional): Clustering backend, see fuzzy.clustering.cluster_centers:
+            'kmeans' (scikit-learn KMeans), 'exact' (optimal 1-D k-means on the sorted data) or
+            'histogram' (optimal 1-D k-means on a `bins`-bin histogram). Defaults to 'kmeans'.
+        bins (int, optional): Number of histogram bins for method='histogram'.
+            Defaults to DEFAULT_HISTOGRAM_BINS.
 
     Returns:
-        dict: A dictionary where 'universe' maps to the universe array,
-              and each set_name maps to its membership function array.
+        dict: For 'analytic', 'bounds' maps to the (min, max) of the universe and 'trimf' maps
+              each set_name to its (a, b, c) breakpoints. For 'sampled', 'universe' maps to the
+              universe array and each set_name maps to its membership function array.
     """
+    if representation not in ('analytic', 'sampled'):
+        raise ValueError("representation must be 'analytic' or 'sampled'")
+
     if num_sets is None:
         num_sets = DEFAULT_NUM_SETS
 
@@ -29,8 +44,11 @@ def auto_partition(data_series, num_sets=None, set_names=None, universe_size=500
     elif len(set_names) != num_sets:
         raise ValueError("Length of set_names must be equal to num_sets")
 
-    min_val = data_series.min()
-    max_val = data_series.max()
+    if value_range is not None:
+        min_val, max_val = value_range
+    else:
+        min_val = data_series.min()
+        max_val = data_series.max()
 
     if min_val == max_val:
         # Handle constant data series: create a single, narrow triangular MF
@@ -51,21 +69,14 @@ def auto_partition(data_series, num_sets=None, set_names=None, universe_size=500
             if u_pts[0] == u_pts[1] or u_pts[1] == u_pts[2]:
                  u_pts = [-0.1, 0.0, 0.1] # Absolute fallback for zero-like values
 
-        x = np.linspace(u_pts[0], u_pts[-1], universe_size)
-        
         # Create one fuzzy set centered at min_val
         # All other sets, if num_sets > 1, would be identical, so we simplify.
-        mf = skm.trimf(x, [u_pts[0], float(min_val), u_pts[-1]])
-        return {'universe': x, set_names[0]: mf}
+        fuzzy_output = {'bounds': (u_pts[0], u_pts[-1]),
+                        'trimf': {set_names[0]: (u_pts[0], float(min_val), u_pts[-1])}}
+        return _as_representation(fuzzy_output, representation, universe_size)
 
-    x = np.linspace(min_val, max_val, universe_size)
-    data_reshaped = data_series.values.reshape(-1, 1)
-
-    # KMeans clustering
-    # n_init='auto' is for scikit-learn >= 1.2. Use n_init=10 for older versions if needed.
-    kmeans = KMeans(n_clusters=num_sets, n_init='auto', random_state=random_state)
-    kmeans.fit(data_reshaped)
-    centers = np.sort(kmeans.cluster_centers_.flatten())
+    centers = cluster_centers(np.asarray(data_series, dtype=float), num_sets, method=method,
+                              random_state=random_state, bins=bins, value_range=(min_val, max_val))
 
     # Ensure centers are unique; if k-means produces duplicate centers (e.g. few unique data points)
     # This can happen if data_series.nunique() < num_sets
@@ -76,22 +87,30 @@ def auto_partition(data_series, num_sets=None, set_names=None, universe_size=500
         num_sets = len(unique_centers)
         set_names = set_names[:num_sets] 
         centers = np.array(unique_centers)
-        if num_sets == 0 : # Should not happen if data_series is not empty and min_val != max_val
-             return {'universe': x} # empty MFs
 
-    fuzzy_output = {'universe': x}
+    breakpoints = {}
+    fuzzy_output = {'bounds': (min_val, max_val), 'trimf': breakpoints}
     
-    if num_sets == 0: # After potential adjustment
-        return fuzzy_output
+    if num_sets == 0: # After potential adjustment; should not happen if data_series is not empty
+        return _as_representation(fuzzy_output, representation, universe_size) # empty MFs
     elif num_sets == 1:
-        fuzzy_output[set_names[0]] = skm.trimf(x, [min_val, centers[0], max_val])
+        breakpoints[set_names[0]] = (min_val, centers[0], max_val)
     else:
         # First MF: from min_val, peak at centers[0], end at centers[1]
-        fuzzy_output[set_names[0]] = skm.trimf(x, [min_val, centers[0], centers[1]])
+        breakpoints[set_names[0]] = (min_val, centers[0], centers[1])
         # Middle MFs
         for i in range(1, num_sets - 1):
-            fuzzy_output[set_names[i]] = skm.trimf(x, [centers[i-1], centers[i], centers[i+1]])
+            breakpoints[set_names[i]] = (centers[i-1], centers[i], centers[i+1])
         # Last MF: from centers[num_sets-2], peak at centers[num_sets-1], end at max_val
-        fuzzy_output[set_names[num_sets-1]] = skm.trimf(x, [centers[num_sets-2], centers[num_sets-1], max_val])
+        breakpoints[set_names[num_sets-1]] = (centers[num_sets-2], centers[num_sets-1], max_val)
         
+    return _as_representation(fuzzy_output, representation, universe_size)
+
+
+def _as_representation(fuzzy_output, representation, universe_size):
+    """Converts analytic fuzzy set data to the requested representation."""
+    fuzzy_output['bounds'] = tuple(float(v) for v in fuzzy_output['bounds'])
+    fuzzy_output['trimf'] = {name: tuple(float(v) for v in abc) for name, abc in fuzzy_output['trimf'].items()}
+    if representation == 'sampled':
+        return to_sampled(fuzzy_output, universe_size)
     return fuzzy_output
@@ -0,0 +1,239 @@
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.image import imsave
+from matplotlib.patches import Polygon
+from fuzzy import instrumentation
+from fuzzy.membership import membership, region_names
+from fuzzy.visualization import mf_curve
+
+# Output formats render_activation_reports can write
+REPORT_FORMATS = ('png', 'svg')
+
+
+class ActivationRenderer:
+    """
+    Renders rule-activation plots for many readings into one reused figure.
+
+    The figure has one panel per sensor and is drawn with the Agg canvas directly, so no
+    pyplot state or interactive backend is involved. The partition curves, axes, grid and
+    layout are drawn once, when the renderer is built. Each reading then only updates the
+    overlay artists: the value line, the rule's highlighted region, the membership marker
+    and the titles. For PNG the static part is kept as a pixel buffer and only the overlays
+    are drawn on top of it; SVG output is vector, so each file redraws the whole figure.
+
+    Unlike plot_input_membership_for_rule_antecedent, the panels are fixed: every report
+    shows all sensors, and sensors outside the rule's antecedent are marked as such. A
+    sensor without usable fuzzy sets gets a static "(no fuzzy sets)" panel.
+
+    Args:
+        fuzzy_sets (dict): Fuzzy set data per sensor.
+        sensors (list of str, optional): Sensors to show, one panel each. Defaults to the
+            keys of fuzzy_sets.
+        figsize_per_plot (tuple, optional): Panel size in inches. Defaults to (5, 3.5).
+        max_cols (int, optional): Panels per row. Defaults to 3.
+        dpi (int, optional): Resolution of PNG output. Defaults to 80.
+    """
+
+    def __init__(self, fuzzy_sets, sensors=None, figsize_per_plot=(5, 3.5), max_cols=3, dpi=80):
+        self.fuzzy_sets = fuzzy_sets
+        self.sensors = list(fuzzy_sets.keys()) if sensors is None else list(sensors)
+        ncols = max(1, min(max_cols, len(self.sensors)))
+        nrows = max(1, math.ceil(len(self.sensors) / ncols))
+        self.dpi = dpi
+        self.figure = Figure(figsize=(ncols * figsize_per_plot[0], nrows * figsize_per_plot[1]), dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        axes = self.figure.subplots(nrows, ncols, squeeze=False).flatten()
+        for ax in axes[len(self.sensors):]:
+            self.figure.delaxes(ax)
+
+        self.panels = []
+        for ax, sensor in zip(axes, self.sensors):
+            sensor_sets = fuzzy_sets.get(sensor)
+            if not region_names(sensor_sets):
+                ax.set_title(f"{sensor}\n(no fuzzy sets)")
+                ax.text(0.5, 0.5, "Fuzzy set data\nmissing", ha='center', va='center', transform=ax.transAxes)
+                ax.set_xticks([])
+                ax.set_yticks([])
+                self.panels.append(None)
+                continue
+            for name in region_names(sensor_sets):
+                ax.plot(*mf_curve(sensor_sets, name), linewidth=1, label=name)
+            ax.set_xlabel('Sensor Value')
+            ax.set_ylabel('Membership Degree')
+            ax.set_ylim(-0.05, 1.15)
+            ax.grid(True)
+            ax.set_autoscale_on(False) # overlays must not move the static axes
+            panel = {
+                'ax': ax,
+                'value_line': ax.axvline(0.0, color='r', linestyle='--'),
+                'rule_line': ax.plot([], [], color='k', linewidth=2.5)[0],
+                'rule_fill': ax.add_patch(Polygon(np.zeros((1, 2)), closed=True, color='k', alpha=0.2)),
+                'marker': ax.plot([], [], 'ro', markersize=8)[0],
+                'label': ax.text(0.0, 0.0, '', color='r', ha='center'),
+                'title': ax.title,
+            }
+            ax.set_title(f"{sensor}: Val 0.00 in 'region' (μ=0.00)") # typical title for the layout
+            self.panels.append(panel)
+        self.suptitle = self.figure.suptitle('Activation for Rule -> N/A (Firing Strength: 0.0000)', fontsize=14)
+        self.figure.tight_layout(rect=[0, 0, 1, 0.95])
+
+        self._overlays = [self.suptitle] + [panel[key] for panel in self.panels if panel is not None
+                                            for key in ('rule_fill', 'rule_line', 'value_line', 'marker', 'label', 'title')]
+        self._set_animated(True)
+        self.canvas.draw()
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+
+    def render(self, reading, rule_info, path):
+        """
+        Writes the activation plot of one reading to path.
+
+        Args:
+            reading (dict): Sensor values of the reading.
+            rule_info (dict or None): The activated rule, as in diagnose's
+                'activated_rule_info' ('antecedent', 'consequent', 'firing_strength'), or
+                None if no rule applied.
+            path (str): Output file; the extension selects PNG or SVG.
+
+        Returns:
+            str: path.
+        """
+        self._update(reading, rule_info)
+        if str(path).lower().endswith('.svg'):
+            self._set_animated(False)
+            try:
+                self.figure.savefig(path, format='svg')
+            finally:
+                self._set_animated(True)
+            return path
+
+        self.canvas.restore_region(self._background)
+        for artist in self._overlays:
+            if artist.get_visible():
+                self.figure.draw_artist(artist)
+        imsave(path, np.asarray(self.canvas.buffer_rgba()), format='png', dpi=self.dpi)
+        return path
+
+    def close(self):
+        """Releases the figure."""
+        self.figure.clear()
+
+    def _set_animated(self, flag):
+        # animated artists are skipped by a full draw, which leaves the static background
+        for artist in self._overlays:
+            artist.set_animated(flag)
+
+    def _update(self, reading, rule_info):
+        antecedent = rule_info.get('antecedent', {}) if rule_info else {}
+        if rule_info:
+            self.suptitle.set_text(f"Activation for Rule -> {rule_info.get('consequent', 'N/A')} "
+                                   f"(Firing Strength: {rule_info.get('firing_strength', 0.0):.4f})")
+        else:
+            self.suptitle.set_text('No applicable rule')
+
+        for sensor, panel in zip(self.sensors, self.panels):
+            if panel is None:
+                continue
+            value = reading.get(sensor)
+            if value is not None and np.isnan(value):
+                value = None
+            region = antecedent.get(sensor)
+            sensor_sets = self.fuzzy_sets[sensor]
+            in_rule = region is not None and region in region_names(sensor_sets)
+            panel['value_line'].set_visible(value is not None)
+            panel['rule_line'].set_visible(in_rule)
+            panel['rule_fill'].set_visible(in_rule)
+            panel['marker'].set_visible(in_rule and value is not None)
+            panel['label'].set_visible(in_rule and value is not None)
+
+            if in_rule:
+                x, y = mf_curve(sensor_sets, region)
+                panel['rule_line'].set_data(x, y)
+                panel['rule_fill'].set_xy(np.column_stack([np.r_[x, x[-1], x[0]], np.r_[y, 0.0, 0.0]]))
+            if value is None:
+                panel['title'].set_text(f"{sensor}\n(Test value missing)")
+                continue
+            panel['value_line'].set_xdata([value, value])
+            if not in_rule:
+                detail = '(not in rule)' if region is None else f"(Region '{region}' not found)"
+                panel['title'].set_text(f"{sensor}: Val {value:.2f} {detail}")
+                continue
+            degree = float(membership(sensor_sets, region, value))
+            panel['marker'].set_data([value], [degree])
+            panel['label'].set_position((value, degree + 0.05))
+            panel['label'].set_text(f'{degree:.2f}')
+            panel['title'].set_text(f"{sensor}: Val {value:.2f} in '{region}' (μ={degree:.2f})")
+
+
+_worker_renderer = None
+
+
+def _init_worker(fuzzy_sets, sensors, renderer_kwargs):
+    # one renderer per worker process, reused for every chunk it is given
+    global _worker_renderer
+    _worker_renderer = ActivationRenderer(fuzzy_sets, sensors, **renderer_kwargs)
+
+
+def _render_chunk(jobs):
+    return [_worker_renderer.render(reading, rule_info, path) for reading, rule_info, path in jobs]
+
+
+def render_activation_reports(items, fuzzy_sets, output_dir, sensors=None, fmt='png', n_workers=None,
+                              prefix='activation_', **renderer_kwargs):
+    """
+    Renders the rule activation of many readings to image files, headless and in parallel.
+
+    Readings are split into contiguous chunks and rendered on a process pool. Every worker
+    builds one ActivationRenderer and reuses it for all of its readings. The number of
+    plots per second includes starting the pool.
+
+    Args:
+        items (iterable of tuple): (reading, rule_info) pairs, e.g. a reading and the
+            'activated_rule_info' of its diagnosis (None if no rule applied).
+        fuzzy_sets (dict): Fuzzy set data per sensor.
+        output_dir (str): Directory for the files; created if missing.
+        sensors (list of str, optional): Sensors to show. Defaults to the keys of fuzzy_sets.
+        fmt (str, optional): 'png' or 'svg'. Defaults to 'png'.
+        n_workers (int, optional): Number of worker processes; 1 renders in this process.
+            Defaults to os.cpu_count().
+        prefix (str, optional): File name prefix; files are numbered in input order.
+            Defaults to 'activation_'.
+        **renderer_kwargs: Passed on to ActivationRenderer (figsize_per_plot, max_cols, dpi).
+
+    Returns:
+        dict: 'paths' (one file per item, in input order), 'plots', 'seconds' and
+              'plots_per_second'.
+    """
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format '{fmt}', expected one of {REPORT_FORMATS}")
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+    t_start = time.perf_counter()
+    jobs = [(reading, rule_info, os.path.join(output_dir, f'{prefix}{i:06d}.{fmt}'))
+            for i, (reading, rule_info) in enumerate(items)]
+
+    if n_workers == 1 or len(jobs) <= 1:
+        renderer = ActivationRenderer(fuzzy_sets, sensors, **renderer_kwargs)
+        try:
+            paths = [renderer.render(*job) for job in jobs]
+        finally:
+            renderer.close()
+    else:
+        # a few chunks per worker keeps the workers busy to the end without per-plot overhead
+        chunk_size = max(1, math.ceil(len(jobs) / (4 * n_workers)))
+        chunks = [jobs[start:start + chunk_size] for start in range(0, len(jobs), chunk_size)]
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                 initargs=(fuzzy_sets, sensors, renderer_kwargs)) as pool:
+            paths = [path for chunk_paths in pool.map(_render_chunk, chunks) for path in chunk_paths]
+
+    seconds = time.perf_counter() - t_start
+    plots_per_second = len(paths) / seconds if seconds > 0 else float('inf')
+    if instrumentation.sinks:
+        instrumentation.emit('render_activation_reports', plots=len(paths), fmt=fmt, n_workers=n_workers,
+                             render_seconds=seconds, plots_per_second=plots_per_second)
+    return {'paths': paths, 'plots': len(paths), 'seconds': seconds, 'plots_per_second': plots_per_second}
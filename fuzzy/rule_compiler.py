@@ -0,0 +1,127 @@
+import numpy as np
+from fuzzy.membership import is_analytic, region_names
+
+
+def compile_rules(rules, fuzzy_sets):
+    """
+    Compiles a priority-sorted list of rule dicts into integer-coded arrays.
+
+    Sensors and regions are numbered once, so inference can work on array indices instead
+    of dict lookups, and an inverted index maps every (sensor, region) pair to the rules
+    whose antecedent uses it. Rule order is preserved, so rule id i is rules[i].
+
+    Args:
+        rules (list of dict): Rules sorted by priority, as returned by generate_rules.
+        fuzzy_sets (dict): Fuzzy set data per sensor, as returned by auto_partition.
+
+    Returns:
+        dict: The compiled rule base with keys
+              'sensors' (list of str): sensors in rule antecedents first, then the other
+                  sensors of fuzzy_sets.
+              'region_names' (list of list of str): per sensor, the regions with a usable MF
+                  followed by any region names that only appear in rules.
+              'n_regions' (int array): per sensor, how many leading region_names have an MF.
+              'antecedents' (int array, rules x sensors): region code, -1 if the sensor is
+                  not part of the rule's antecedent.
+              'antecedent_sizes' (int array): number of sensors in each antecedent.
+              'consequents' (int array): index into 'labels' per rule.
+              'labels' (list): distinct consequents in order of first appearance.
+              'support', 'confidence', 'priority' (float arrays): NaN where a rule lacks the key.
+              'pair_offsets' (int array): start of each sensor's block of (sensor, region) pair ids.
+              'index_offsets', 'index_rules' (int arrays): CSR inverted index, the rule ids
+                  using pair p are index_rules[index_offsets[p]:index_offsets[p + 1]].
+              'shared_sensors' (int array): sensors referenced by every rule.
+              'analytic' (bool array): per sensor, whether its fuzzy sets are analytic.
+              'breakpoints' (float array, sensors x regions x 3): triangle breakpoints of
+                  analytic regions, NaN elsewhere, for evaluating all sensors in one pass.
+              'rules' (list of dict): the source rules.
+    """
+    sensors = []
+    seen = set()
+    for rule in rules:
+        for sensor in rule['antecedent']:
+            if sensor not in seen:
+                seen.add(sensor)
+                sensors.append(sensor)
+    sensors.extend(s for s in fuzzy_sets if s not in seen)
+    sensor_index = {sensor: i for i, sensor in enumerate(sensors)}
+
+    sensor_regions = [region_names(fuzzy_sets.get(sensor)) for sensor in sensors]
+    n_regions = np.array([len(names) for names in sensor_regions], dtype=np.intp)
+    region_index = [{name: j for j, name in enumerate(names)} for names in sensor_regions]
+
+    labels = []
+    label_index = {}
+    antecedents = np.full((len(rules), len(sensors)), -1, dtype=np.intp)
+    consequents = np.empty(len(rules), dtype=np.intp)
+    for r, rule in enumerate(rules):
+        for sensor, region in rule['antecedent'].items():
+            i = sensor_index[sensor]
+            code = region_index[i].get(region)
+            if code is None:
+                # Region without an MF: keep its name so the rule can be reported, it never fires
+                code = region_index[i][region] = len(sensor_regions[i])
+                sensor_regions[i].append(region)
+            antecedents[r, i] = code
+        consequent = rule['consequent']
+        if consequent not in label_index:
+            label_index[consequent] = len(labels)
+            labels.append(consequent)
+        consequents[r] = label_index[consequent]
+
+    def _column(key):
+        return np.array([rule.get(key, np.nan) for rule in rules], dtype=float)
+
+    width = max((len(names) for names in sensor_regions), default=0)
+    analytic = np.array([is_analytic(fuzzy_sets.get(sensor)) for sensor in sensors], dtype=bool)
+    breakpoints = np.full((len(sensors), width, 3), np.nan)
+    for i in np.flatnonzero(analytic):
+        for j in range(n_regions[i]):
+            breakpoints[i, j] = fuzzy_sets[sensors[i]]['trimf'][sensor_regions[i][j]]
+
+    used = antecedents >= 0
+    pair_offsets = np.zeros(len(sensors) + 1, dtype=np.intp)
+    np.cumsum([len(names) for names in sensor_regions], out=pair_offsets[1:])
+    rule_ids, sensor_ids = np.nonzero(used)
+    pair_ids = pair_offsets[sensor_ids] + antecedents[rule_ids, sensor_ids]
+    order = np.argsort(pair_ids, kind='stable') # keeps rule ids ascending within each pair
+    index_offsets = np.zeros(pair_offsets[-1] + 1, dtype=np.intp)
+    np.cumsum(np.bincount(pair_ids, minlength=pair_offsets[-1]), out=index_offsets[1:])
+
+    return {
+        'sensors': sensors,
+        'region_names': sensor_regions,
+        'n_regions': n_regions,
+        'antecedents': antecedents,
+        'antecedent_sizes': used.sum(axis=1),
+        'consequents': consequents,
+        'labels': labels,
+        'support': _column('support'),
+        'confidence': _column('confidence'),
+        'priority': _column('priority'),
+        'pair_offsets': pair_offsets,
+        'index_offsets': index_offsets,
+        'index_rules': rule_ids[order],
+        'shared_sensors': np.flatnonzero(used.all(axis=0)) if len(rules) else np.array([], dtype=np.intp),
+        'analytic': analytic,
+        'breakpoints': breakpoints,
+        'rules': rules,
+    }
+
+
+def compiled_rule(compiled, rule_id):
+    """Returns the rule dict for a rule id, rebuilding it from the arrays if the source rules are not kept."""
+    rules = compiled.get('rules')
+    if rules is not None:
+        return rules[rule_id]
+    codes = compiled['antecedents'][rule_id]
+    rule = {
+        'antecedent': {compiled['sensors'][i]: compiled['region_names'][i][codes[i]]
+                       for i in np.flatnonzero(codes >= 0)},
+        'consequent': compiled['labels'][compiled['consequents'][rule_id]],
+    }
+    for key in ('support', 'confidence', 'priority'):
+        value = compiled[key][rule_id]
+        if not np.isnan(value):
+            rule[key] = float(value)
+    return rule
@@ -1,28 +1,157 @@
+import time
 from collections import Counter
-import skfuzzy.fuzzymath.fuzzy_ops as fuzzy_ops
+import numpy as np
+from fuzzy import instrumentation
+from fuzzy.membership import memberships, region_names
 
+# Rows per block when assigning regions, bounding the (rows x regions) temporaries
+COUNT_CHUNK_SIZE = 1_000_000
 
-def generate_rules(data, fuzzy_sets):
-    # data: list of (reading_dict, label)
+
+def generate_rules(data, fuzzy_sets, label_column=None, sensors=None):
+    # data: list of (reading_dict, label), or a DataFrame with one column per sensor
+    # plus label_column (sensors defaults to the columns that have fuzzy sets)
+    if not instrumentation.sinks:
+        return rules_from_counts(_count_data(data, fuzzy_sets, label_column, sensors))
+    t_start = time.perf_counter()
+    counts = _count_data(data, fuzzy_sets, label_column, sensors)
+    t_counted = time.perf_counter()
+    rules = rules_from_counts(counts)
+    instrumentation.emit('generate_rules', rows=sum(counts.values()), rules=len(rules),
+                         counting_seconds=t_counted - t_start, rule_building_seconds=time.perf_counter() - t_counted)
+    return rules
+
+
+def _count_data(data, fuzzy_sets, label_column, sensors):
+    if hasattr(data, 'columns'):
+        if label_column is None:
+            raise ValueError("label_column is required when data is a DataFrame")
+        if sensors is None:
+            sensors = [s for s in data.columns if s != label_column and s in fuzzy_sets]
+        columns = {sensor: data[sensor].to_numpy(dtype=float) for sensor in sensors}
+        return count_rule_pairs(columns, data[label_column].to_numpy(), fuzzy_sets)
+    if data and any(reading.keys() != data[0][0].keys() for reading, _ in data):
+        return _count_mixed_pairs(data, fuzzy_sets)
+    columns, labels = _columns_from_pairs(data)
+    return count_rule_pairs(columns, labels, fuzzy_sets)
+
+
+def _columns_from_pairs(data):
+    # list of (reading_dict, label) with the same sensors in every reading -> ({sensor: values}, labels)
+    labels = np.empty(len(data), dtype=object) # keeps the label objects as given
+    for row, (_, label) in enumerate(data):
+        labels[row] = label
+    if not data:
+        return {}, labels
+    columns = {sensor: np.fromiter((reading[sensor] for reading, _ in data), dtype=float, count=len(data))
+               for sensor in data[0][0]}
+    return columns, labels
+
+
+def _count_mixed_pairs(data, fuzzy_sets):
+    # Readings with different sensors: regions are still assigned per sensor in one call,
+    # but rule keys are built and counted row by row
+    rows_of = {}
+    for row, (reading, _) in enumerate(data):
+        for sensor in reading:
+            rows_of.setdefault(sensor, []).append(row)
+    region_of = {}
+    for sensor, rows in rows_of.items():
+        values = np.fromiter((data[row][0][sensor] for row in rows), dtype=float, count=len(rows))
+        names = region_names(fuzzy_sets[sensor])
+        region_of[sensor] = dict(zip(rows, (names[i] for i in assign_regions(fuzzy_sets, sensor, values).tolist())))
     counts = Counter()
-    label_counts = Counter()
-    for reading, label in data:
-        regions = {}
-        for sensor, value in reading.items():
-            x = fuzzy_sets[sensor]['universe']
-            mfs = {name: fuzzy_ops.interp_membership(x, mf, value)
-                    for name, mf in fuzzy_sets[sensor].items()
-                    if name != 'universe'}
-            # pick region with max membership
-            regions[sensor] = max(mfs, key=mfs.get)
-        rule_key = tuple(sorted(regions.items()))
+    for row, (reading, label) in enumerate(data):
+        rule_key = tuple(sorted((sensor, region_of[sensor][row]) for sensor in reading))
         counts[(rule_key, label)] += 1
-        label_counts[rule_key] += 1
+    return counts
+
+
+def assign_regions(fuzzy_sets, sensor, values):
+    """Index into region_names(fuzzy_sets[sensor]) of the max-membership region of each value."""
+    names = region_names(fuzzy_sets[sensor])
+    if not names:
+        raise ValueError(f"Sensor '{sensor}' has no usable fuzzy sets")
+    # argmax keeps the first of equal memberships, like max() over the region dict
+    return np.argmax(memberships(fuzzy_sets[sensor], names, values), axis=1)
+
+
+def count_rule_pairs(columns, labels, fuzzy_sets, counts=None):
+    """
+    Counts (antecedent, label) co-occurrences with array operations.
+
+    Args:
+        columns (dict): Sensor name -> 1-D array of readings, all the same length.
+        labels (array-like): Fault label of each row.
+        fuzzy_sets (dict): Fuzzy set data per sensor, as returned by auto_partition.
+        counts (Counter, optional): Counts to add to, e.g. from earlier chunks of the data.
+
+    Returns:
+        Counter: (rule_key, label) -> number of rows, where rule_key is the sorted tuple of
+                 (sensor, region) pairs. Keys are in order of first occurrence, so merging
+                 per-chunk counts in chunk order gives the same order as one pass over all rows.
+    """
+    if counts is None:
+        counts = Counter()
+    labels = np.asarray(labels)
+    sensors = sorted(columns)
+    names = [region_names(fuzzy_sets[sensor]) for sensor in sensors]
+    radix = [len(sensor_names) for sensor_names in names]
+    # Mixed-radix integer key per region tuple; fall back to row-wise unique if it would overflow
+    packed = np.prod([float(r) for r in radix]) * max(len(labels), 1) < 2 ** 62
+
+    for start in range(0, len(labels), COUNT_CHUNK_SIZE):
+        stop = min(start + COUNT_CHUNK_SIZE, len(labels))
+        codes = np.empty((stop - start, len(sensors)), dtype=np.int64)
+        for i, sensor in enumerate(sensors):
+            codes[:, i] = assign_regions(fuzzy_sets, sensor, columns[sensor][start:stop])
+        label_values, label_codes = _factorize(labels[start:stop])
+        n_labels = len(label_values)
+
+        if packed:
+            rule_codes = np.zeros(stop - start, dtype=np.int64)
+            for i in range(len(sensors)):
+                rule_codes = rule_codes * radix[i] + codes[:, i]
+        else:
+            _, rule_codes = np.unique(codes, axis=0, return_inverse=True)
+        pair_codes = rule_codes.reshape(-1) * n_labels + label_codes
+        _, first_rows, pair_counts = np.unique(pair_codes, return_index=True, return_counts=True)
+
+        order = np.argsort(first_rows) # first-occurrence order
+        for row, cnt in zip(first_rows[order].tolist(), pair_counts[order].tolist()):
+            rule_key = tuple((sensor, names[i][codes[row, i]]) for i, sensor in enumerate(sensors))
+            counts[(rule_key, _python_scalar(labels[start + row]))] += cnt
+    return counts
+
+
+def _factorize(labels):
+    # -> (list of distinct labels, code of each row). Object labels (None, mixed types) are
+    # matched by dict equality, as the Counter keys are, and listed by first appearance
+    # instead of sorted, which would fail on them
+    if labels.dtype != object:
+        values, codes = np.unique(labels, return_inverse=True)
+        return values.tolist(), codes.reshape(-1)
+    index = {}
+    codes = np.fromiter((index.setdefault(label, len(index)) for label in labels), dtype=np.int64, count=len(labels))
+    return list(index), codes
+
+
+def _python_scalar(value):
+    # NumPy scalars (np.int64, np.str_, ...) -> the equivalent Python value
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def rules_from_counts(counts):
+    """Builds the priority-sorted rule list from (rule_key, label) counts."""
+    label_counts = Counter()
+    for (rule_key, label), cnt in counts.items():
+        label_counts[rule_key] += cnt
+    total = sum(label_counts.values())
 
     # build rule list
     rules = []
     for (rule_key, label), cnt in counts.items():
-        support = cnt / sum(label_counts.values())
+        support = cnt / total
         confidence = cnt / label_counts[rule_key]
         rules.append({
             'antecedent': dict(rule_key),
@@ -0,0 +1,337 @@
+"""
+Micro-batching diagnosis service speaking newline-delimited JSON.
+
+Each request line is a JSON object {"id": ..., "reading": {sensor: value, ...}} and gets
+one response line {"id": ..., "diagnosed_consequent": ..., "status": ..., "firing_strength": ...,
+"rule_index": ...}, in request order per connection. A request that is not valid JSON or
+has a non-numeric sensor value gets {"id": ..., "error": ...} instead, without affecting
+other requests. {"op": "metrics"} returns the service metrics. Concurrent requests from
+all connections are collected into micro-batches and scored with one diagnose_batch call
+each.
+
+Usage:
+    python -m fuzzy.server --model model.fzm (--port 8765 | --unix /tmp/fuzzy.sock)
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from fuzzy.inference_engine import diagnose_batch
+from fuzzy.rule_compiler import compile_rules
+
+
+class DiagnosisServer:
+    """
+    asyncio diagnosis service with micro-batching and backpressure.
+
+    Args:
+        fuzzy_sets (dict): Fuzzy set data per sensor.
+        rules (list of dict or dict): Rules sorted by priority, or a compiled rule base
+            (e.g. from load_model).
+        threshold (float, optional): Minimum firing strength for a diagnosis. Defaults to 0.4.
+        max_batch_size (int, optional): Most requests scored in one batch. Defaults to 256.
+        max_wait (float, optional): Seconds a batch waits for more requests after the first
+            one arrives. Defaults to 0.002.
+        max_queue (int, optional): Most requests waiting to be batched. When the queue is
+            full, connections stop being read until it drains. Defaults to 10000.
+    """
+
+    def __init__(self, fuzzy_sets, rules, threshold=0.4, max_batch_size=256, max_wait=0.002, max_queue=10000):
+        self.fuzzy_sets = fuzzy_sets
+        self.compiled = rules if isinstance(rules, dict) else compile_rules(rules, fuzzy_sets)
+        self.threshold = threshold
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self._sensor_index = {sensor: i for i, sensor in enumerate(self.compiled['sensors'])}
+        self._queue = None
+        self._batcher = None
+        self._servers = []
+        # one scoring thread keeps the event loop free to read requests while a batch is scored
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._metrics = {
+            'requests': 0,
+            'errors': 0,
+            'batches': 0,
+            'max_queue_depth': 0,
+            'batch_size_total': 0,
+            'max_batch_size_seen': 0,
+            'batch_size_histogram': {},
+            'scoring_seconds': 0.0,
+        }
+
+    async def start(self, host='127.0.0.1', port=None, path=None):
+        """Starts listening on a TCP port or, if path is given, a Unix socket."""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._batcher = asyncio.create_task(self._run_batches())
+        if path is not None:
+            server = await asyncio.start_unix_server(self._handle_connection, path=path)
+        else:
+            server = await asyncio.start_server(self._handle_connection, host=host, port=port)
+        self._servers.append(server)
+        return server
+
+    async def close(self):
+        """Stops listening, cancels the batching task and fails requests still queued."""
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError("server closed"))
+        self._queue = None
+        self._executor.shutdown(wait=False)
+
+    async def diagnose(self, reading):
+        """
+        Queues one reading for the next micro-batch and waits for its result.
+
+        Raises ValueError if a sensor value is not a number.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._enqueue(self._reading_row(reading), future)
+        return await future
+
+    def _reading_row(self, reading):
+        # Validates a reading and returns its row of sensor values. Unknown sensors are
+        # ignored; missing sensors and null values are NaN, which scores like a missing sensor
+        row = np.full(len(self._sensor_index), np.nan)
+        for sensor, value in reading.items():
+            i = self._sensor_index.get(sensor)
+            if i is None or value is None:
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"value of sensor '{sensor}' must be a number, got {type(value).__name__}")
+            try:
+                row[i] = value
+            except OverflowError:
+                raise ValueError(f"value of sensor '{sensor}' is out of range") from None
+        return row
+
+    async def _enqueue(self, row, future):
+        queue = self._queue
+        if queue is None:
+            raise RuntimeError("server is not running")
+        await queue.put((row, future)) # blocks while the queue is full
+        if self._queue is not queue: # closed while waiting for room
+            raise RuntimeError("server closed")
+        self._metrics['max_queue_depth'] = max(self._metrics['max_queue_depth'], queue.qsize())
+
+    def metrics(self):
+        """Snapshot of queue-depth and batch-size metrics."""
+        m = dict(self._metrics)
+        m['batch_size_histogram'] = dict(sorted(m['batch_size_histogram'].items()))
+        m['queue_depth'] = self._queue.qsize() if self._queue is not None else 0
+        m['mean_batch_size'] = m['batch_size_total'] / m['batches'] if m['batches'] else 0.0
+        return m
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # drain whatever is already queued without waiting
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            start = time.perf_counter()
+            try:
+                outcomes = await loop.run_in_executor(self._executor, self._score_isolated,
+                                                      [row for row, _ in batch])
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(RuntimeError("server closed"))
+                raise
+            self._metrics['scoring_seconds'] += time.perf_counter() - start
+            for (_, future), outcome in zip(batch, outcomes):
+                if future.done():
+                    continue
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
+            self._record_batch(len(batch))
+
+    def _score_isolated(self, rows):
+        # Scores the batch at once; if that fails, rows are rescored one by one so an error
+        # is only reported to the request that caused it
+        try:
+            return self._score(rows)
+        except Exception as exc:
+            if len(rows) == 1:
+                return [exc]
+        outcomes = []
+        for row in rows:
+            try:
+                outcomes.extend(self._score([row]))
+            except Exception as exc:
+                outcomes.append(exc)
+        return outcomes
+
+    def _score(self, rows):
+        # validated rows (see _reading_row) -> one diagnose_batch call
+        values = np.vstack(rows)
+        out = diagnose_batch(values, self.fuzzy_sets, self.compiled, threshold=self.threshold,
+                             sensors=self.compiled['sensors'])
+        results = [{
+            'diagnosed_consequent': out['diagnosed_consequent'][row],
+            'status': out['status'][row],
+            'firing_strength': None if math.isnan(out['firing_strength'][row]) else float(out['firing_strength'][row]),
+            'rule_index': int(out['rule_index'][row]),
+        } for row in range(len(rows))]
+        return results
+
+    def _record_batch(self, size):
+        m = self._metrics
+        m['batches'] += 1
+        m['batch_size_total'] += size
+        m['max_batch_size_seen'] = max(m['max_batch_size_seen'], size)
+        bucket = 1 << (size - 1).bit_length() # power-of-two upper bound
+        m['batch_size_histogram'][bucket] = m['batch_size_histogram'].get(bucket, 0) + 1
+
+    async def _handle_connection(self, reader, writer):
+        # Readings are queued for batching here, in the reader loop, so a full batching
+        # queue stops this connection from being read until it drains. Responses are
+        # written in request order by a separate task, so a connection can pipeline
+        # requests; the bounded pending queue also bounds per-connection memory. Once the
+        # responder has closed the writer (the client went away), reading stops.
+        loop = asyncio.get_running_loop()
+        pending = asyncio.Queue(maxsize=self.max_batch_size)
+        responder = asyncio.create_task(self._write_responses(pending, writer))
+        try:
+            while not writer.is_closing():
+                try:
+                    line = await reader.readline()
+                except ConnectionError:
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                request_id, row, response = self._handle_line(line)
+                if response is not None:
+                    await pending.put(response)
+                    continue
+                future = loop.create_future()
+                try:
+                    await self._enqueue(row, future)
+                except RuntimeError as exc:
+                    await pending.put({'id': request_id, 'error': str(exc)})
+                    break
+                await pending.put((request_id, future))
+        finally:
+            if not responder.done():
+                await pending.put(None)
+            await responder
+
+    def _handle_line(self, line):
+        # -> (request id, validated reading row, None), or (request id, None, immediate response)
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as exc:
+            self._metrics['errors'] += 1
+            return None, None, {'id': None, 'error': f"invalid request: {exc}"}
+        request_id = request.get('id')
+        if request.get('op') == 'metrics':
+            return request_id, None, {'id': request_id, 'metrics': self.metrics()}
+        reading = request.get('reading')
+        if not isinstance(reading, dict):
+            self._metrics['errors'] += 1
+            return request_id, None, {'id': request_id, 'error': "request needs a 'reading' object"}
+        try:
+            row = self._reading_row(reading)
+        except ValueError as exc:
+            self._metrics['errors'] += 1
+            return request_id, None, {'id': request_id, 'error': f"invalid reading: {exc}"}
+        self._metrics['requests'] += 1
+        return request_id, row, None
+
+    async def _write_responses(self, pending, writer):
+        # If the connection fails, the writer is closed and the rest of the queue is still
+        # consumed up to the None sentinel, without writing, so the reader loop can never
+        # block on a full pending queue. Requests still waiting are cancelled.
+        connected = True
+        try:
+            while True:
+                item = await pending.get()
+                if item is None:
+                    break
+                if not connected:
+                    if not isinstance(item, dict):
+                        item[1].cancel()
+                    continue
+                if isinstance(item, dict):
+                    response = item
+                else:
+                    request_id, future = item
+                    try:
+                        response = {'id': request_id, **await future}
+                    except Exception as exc:
+                        self._metrics['errors'] += 1
+                        response = {'id': request_id, 'error': str(exc)}
+                try:
+                    writer.write(json.dumps(response, default=str).encode('utf-8') + b'\n')
+                    await writer.drain()
+                except ConnectionError:
+                    connected = False
+                    writer.close()
+        finally:
+            writer.close()
+
+
+async def serve(fuzzy_sets, rules, host='127.0.0.1', port=8765, path=None, **server_kwargs):
+    """Runs a DiagnosisServer until cancelled."""
+    server = DiagnosisServer(fuzzy_sets, rules, **server_kwargs)
+    listener = await server.start(host=host, port=port, path=path)
+    try:
+        await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', required=True, help="model file written by save_model")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="listen on this Unix socket path instead of TCP")
+    parser.add_argument('--threshold', type=float, default=0.4)
+    parser.add_argument('--max-batch-size', type=int, default=256)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    parser.add_argument('--max-queue', type=int, default=10000)
+    args = parser.parse_args()
+
+    from fuzzy.model_io import load_model
+    fuzzy_sets, compiled = load_model(args.model)
+    asyncio.run(serve(fuzzy_sets, compiled, host=args.host, port=args.port, path=args.unix,
+                      threshold=args.threshold, max_batch_size=args.max_batch_size,
+                      max_wait=args.max_wait_ms / 1000.0, max_queue=args.max_queue))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from fuzzy.inference_engine import _column_map, _membership_tensor, _strength_codes
+from fuzzy.rule_compiler import compile_rules
+
+# Defaults for stream_diagnose
+DEFAULT_WINDOW = 5
+DEFAULT_BATCH_SIZE = 1024
+DEFAULT_MAX_ENGINES = 100_000
+
+
+def _batches(source, sensors, time_column, engine_column, batch_size):
+    # Yields (times, engines, values) micro-batches from a CSV path, a DataFrame or an iterable of dicts
+    if isinstance(source, str):
+        chunks = pd.read_csv(source, chunksize=batch_size)
+    elif hasattr(source, 'columns'):
+        chunks = (source.iloc[start:start + batch_size] for start in range(0, len(source), batch_size))
+    else:
+        chunks = None
+    if chunks is not None:
+        for chunk in chunks:
+            times = chunk[time_column].tolist() if time_column in chunk.columns else [None] * len(chunk)
+            engines = chunk[engine_column].tolist() if engine_column is not None else [None] * len(chunk)
+            values = chunk.reindex(columns=sensors).to_numpy(dtype=float) # missing columns are NaN
+            yield times, engines, values
+        return
+
+    rows = []
+    for row in source:
+        rows.append(row)
+        if len(rows) == batch_size:
+            yield _rows_batch(rows, sensors, time_column, engine_column)
+            rows = []
+    if rows:
+        yield _rows_batch(rows, sensors, time_column, engine_column)
+
+
+def _rows_batch(rows, sensors, time_column, engine_column):
+    values = np.array([[row.get(sensor, np.nan) for sensor in sensors] for row in rows], dtype=float)
+    engines = [row.get(engine_column) if engine_column is not None else None for row in rows]
+    return [row.get(time_column) for row in rows], engines, values
+
+
+def stream_diagnose(source, fuzzy_sets, rules, sensors=None, time_column='Time_Stamp', engine_column=None,
+                    window=DEFAULT_WINDOW, threshold=0.4, release=None, margin=0.1, max_gap=None,
+                    batch_size=DEFAULT_BATCH_SIZE, max_engines=DEFAULT_MAX_ENGINES, state=None):
+    """
+    Diagnoses a stream of readings, smoothing over time and holding the fault state steady.
+
+    Rows are read incrementally and scored in micro-batches of batch_size with the
+    vectorized rule scan. For every row, each consequent gets the strength of its strongest
+    rule. Those per-consequent strengths are averaged over the engine's last `window`
+    readings. The engine's fault state then follows the smoothed strengths with hysteresis:
+    - With no fault, the state becomes the top consequent once its smoothed strength
+      reaches threshold.
+    - A fault is kept until its smoothed strength falls below release. It is also replaced
+      if another consequent reaches threshold and leads it by at least margin.
+    So a single noisy reading cannot flip the state. Consequents with equal smoothed strength
+    are ranked by the priority of their best rule. The output does not depend on batch_size.
+
+    Each engine keeps at most window - 1 past strength vectors, its fault state and its
+    last timestamp. At most max_engines engines are kept; the least recently seen is
+    dropped first. Readings of each engine must arrive in time order.
+
+    Args:
+        source (str, pd.DataFrame or iterable of dict): CSV path (read in chunks), DataFrame,
+            or iterable of row dicts. Rows hold the sensor values and optionally time_column
+            and engine_column; missing or NaN sensor values count as missing sensors.
+        fuzzy_sets (dict): Fuzzy set data per sensor.
+        rules (list of dict or dict): Rules sorted by priority, or a compiled rule base.
+        sensors (list of str, optional): Sensors to score. Defaults to the keys of fuzzy_sets.
+        time_column (str, optional): Timestamp column, passed through to the output.
+            Defaults to 'Time_Stamp'.
+        engine_column (str, optional): Column identifying the engine. Defaults to None, a
+            single stream.
+        window (int, optional): Readings averaged per engine. Defaults to DEFAULT_WINDOW.
+        threshold (float, optional): Smoothed strength needed to raise a fault. Defaults to 0.4.
+        release (float, optional): Smoothed strength below which a fault is cleared.
+            Defaults to threshold - margin.
+        margin (float, optional): Lead another consequent needs to replace the current
+            fault. Defaults to 0.1.
+        max_gap (float, optional): Seconds between two readings of an engine after which its
+            window is restarted. Requires parseable timestamps. Defaults to no limit.
+        batch_size (int, optional): Rows scored per micro-batch. Defaults to DEFAULT_BATCH_SIZE.
+        max_engines (int, optional): Most engines kept in state. Defaults to DEFAULT_MAX_ENGINES.
+        state (OrderedDict, optional): Per-engine state from a previous call, to resume a
+            stream; updated in place.
+
+    Yields:
+        dict: One per row, in input order: 'time', 'engine', 'fault' (current fault state,
+              None if none), 'fault_strength' (its smoothed strength, None if no fault),
+              'top_consequent' and 'top_strength' (strongest consequent after smoothing),
+              'changed' (True if the fault state changed at this row).
+    """
+    compiled = rules if isinstance(rules, dict) else compile_rules(rules, fuzzy_sets)
+    if sensors is None:
+        sensors = list(fuzzy_sets.keys())
+    if release is None:
+        release = threshold - margin
+    if state is None:
+        state = OrderedDict()
+    labels = compiled['labels']
+    n_labels = len(labels)
+    column_of = _column_map(compiled, sensors)
+    # rules grouped by consequent, so per-consequent maxima are one reduceat
+    by_label = np.argsort(compiled['consequents'], kind='stable')
+    codes = _strength_codes(compiled)[by_label]
+    label_starts = np.searchsorted(compiled['consequents'][by_label], np.arange(n_labels))
+
+    for times, engines, values in _batches(source, sensors, time_column, engine_column, batch_size):
+        n = len(values)
+        if n_labels:
+            mems = _membership_tensor(compiled, fuzzy_sets, {i: values[:, k] for i, k in column_of.items()}, n)
+            strengths = _consequent_strengths(mems, codes, label_starts)
+        else:
+            strengths = np.zeros((n, 0))
+        seconds = (pd.to_datetime(pd.Series(times)).to_numpy().astype('datetime64[ns]').astype(np.int64) / 1e9
+                   if max_gap is not None else None)
+        smoothed = _smooth(strengths, engines, seconds, state, window, max_gap)
+
+        # labels are in order of each consequent's highest-priority rule, so argmax breaks ties by it
+        top = np.argmax(smoothed, axis=1) if n_labels else np.zeros(n, dtype=np.intp)
+        top_strength = smoothed[np.arange(n), top] if n_labels else np.zeros(n)
+        smoothed_rows = smoothed.tolist()
+        for row in range(n):
+            engine = engines[row]
+            engine_state = state[engine]
+            fault = engine_state['fault']
+            candidate = int(top[row])
+            candidate_strength = float(top_strength[row])
+            new_fault = fault
+            if fault < 0:
+                if n_labels and candidate_strength >= threshold:
+                    new_fault = candidate
+            else:
+                fault_strength = smoothed_rows[row][fault]
+                if fault_strength < release:
+                    new_fault = candidate if candidate_strength >= threshold else -1
+                elif candidate != fault and candidate_strength >= threshold and candidate_strength >= fault_strength + margin:
+                    new_fault = candidate
+            engine_state['fault'] = new_fault
+            yield {
+                'time': times[row],
+                'engine': engine,
+                'fault': labels[new_fault] if new_fault >= 0 else None,
+                'fault_strength': smoothed_rows[row][new_fault] if new_fault >= 0 else None,
+                'top_consequent': labels[candidate] if n_labels else None,
+                'top_strength': candidate_strength,
+                'changed': new_fault != fault,
+            }
+        while len(state) > max_engines:
+            state.popitem(last=False)
+
+
+def _consequent_strengths(mems, codes, label_starts):
+    # (rows x consequents) strength of each consequent's strongest rule. Rules are gathered
+    # as contiguous (rules x rows) blocks, which is faster than gathering columns
+    by_sensor = np.ascontiguousarray(mems.transpose(1, 2, 0))
+    strengths = by_sensor[0][codes[:, 0]] if codes.shape[1] else np.zeros((len(codes), mems.shape[0]))
+    for i in range(1, codes.shape[1]):
+        np.minimum(strengths, by_sensor[i][codes[:, i]], out=strengths)
+    return np.maximum.reduceat(strengths, label_starts, axis=0).T
+
+
+def _smooth(strengths, engines, seconds, state, window, max_gap):
+    """
+    Rolling mean of per-consequent strengths over each engine's last `window` readings.
+
+    The batch is grouped by engine (stable, so time order is kept) and each engine's stored
+    history is prepended to its rows; a restart after max_gap drops the history. Each row's
+    window is then summed directly, newest reading first, so a row's mean is the same bit for
+    bit however the stream is split into batches. Updates each engine's state.
+    """
+    n, n_labels = strengths.shape
+    keys = {}
+    group = np.array([keys.setdefault(engine, len(keys)) for engine in engines], dtype=np.intp)
+    order = np.argsort(group, kind='stable')
+    sorted_group = group[order]
+    group_starts = np.searchsorted(sorted_group, np.arange(len(keys)))
+    group_stops = np.append(group_starts[1:], n)
+
+    pieces = []
+    segment_starts = [] # in the extended array
+    batch_positions = np.empty(n, dtype=np.intp) # extended position of each sorted row
+    last_segments = {} # engine -> extended range of its last segment
+    offset = 0
+    for engine, g in keys.items():
+        engine_state = state.get(engine)
+        if engine_state is None:
+            engine_state = state[engine] = {'history': np.empty((0, n_labels)), 'fault': -1, 'last_time': None}
+        state.move_to_end(engine)
+        rows = order[group_starts[g]:group_stops[g]]
+        restarts = np.zeros(len(rows), dtype=bool)
+        if seconds is not None:
+            previous = np.concatenate([[engine_state['last_time'] if engine_state['last_time'] is not None
+                                        else -np.inf], seconds[rows[:-1]]])
+            restarts = seconds[rows] - previous > max_gap
+            restarts[0] &= engine_state['last_time'] is not None
+            engine_state['last_time'] = seconds[rows[-1]]
+        history = engine_state['history'] if not restarts[0] else np.empty((0, n_labels))
+        segment_starts.append(offset)
+        pieces.append(history)
+        offset += len(history)
+        for restart in np.flatnonzero(restarts[1:]) + 1:
+            segment_starts.append(offset + restart)
+        batch_positions[group_starts[g]:group_stops[g]] = offset + np.arange(len(rows))
+        pieces.append(strengths[rows])
+        offset += len(rows)
+        last_segments[engine] = (segment_starts[-1], offset)
+
+    extended = np.concatenate(pieces) if pieces else np.empty((0, n_labels))
+    segment_of = np.zeros(len(extended), dtype=np.intp)
+    segment_of[np.array(segment_starts[1:], dtype=np.intp)] = 1
+    seg_start = np.array(segment_starts, dtype=np.intp)[np.cumsum(segment_of)]
+    positions = np.arange(len(extended))
+    lower = np.maximum(positions + 1 - window, seg_start)
+    # not a difference of cumulative sums: its rounding depends on where the batch starts,
+    # and that noise would break exact ties between consequents differently per batch size
+    sums = extended.copy()
+    for lag in range(1, window):
+        rows = positions[lag:][positions[lag:] - lag >= lower[lag:]]
+        sums[rows] += extended[rows - lag]
+    means = sums / (positions + 1 - lower)[:, None]
+
+    # keep the last window - 1 vectors of each engine's current segment
+    for engine, (start, stop) in last_segments.items():
+        state[engine]['history'] = extended[max(start, stop - (window - 1)):stop].copy()
+
+    smoothed = np.empty((n, n_labels))
+    smoothed[order] = means[batch_positions]
+    return smoothed
@@ -0,0 +1,241 @@
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from fuzzy import instrumentation
+from fuzzy.partition import auto_partition
+from fuzzy.rule_generator import _factorize, count_rule_pairs, rules_from_counts
+
+# Defaults for streaming training: rows read per chunk, and rows kept for fitting the partitions
+DEFAULT_CHUNK_SIZE = 100_000
+DEFAULT_SAMPLE_SIZE = 100_000
+
+
+def scan_sensor_ranges(csv_path, sensors, chunksize=DEFAULT_CHUNK_SIZE, sample_size=DEFAULT_SAMPLE_SIZE,
+                       random_state=42):
+    """
+    First pass over a CSV: per-sensor min/max and a bounded uniform sample of rows.
+
+    The sample is a bottom-k sample (the rows with the smallest random keys), so it is
+    uniform over the whole file while never holding more than sample_size + chunksize rows.
+
+    Args:
+        csv_path (str): Path of the CSV file.
+        sensors (list of str): Sensor columns to scan.
+        chunksize (int, optional): Rows read per chunk. Defaults to DEFAULT_CHUNK_SIZE.
+        sample_size (int, optional): Number of rows kept for fitting the partitions.
+            Defaults to DEFAULT_SAMPLE_SIZE.
+        random_state (int, optional): Seed of the sampling keys. Defaults to 42.
+
+    Returns:
+        tuple: (ranges, sample) where ranges maps each sensor to its (min, max) over the
+               whole file and sample is a DataFrame with at most sample_size rows, in file order.
+    """
+    rng = np.random.default_rng(random_state)
+    mins = np.full(len(sensors), np.inf)
+    maxs = np.full(len(sensors), -np.inf)
+    sample_rows = np.empty((0, len(sensors)))
+    sample_keys = np.empty(0)
+    sample_pos = np.empty(0, dtype=np.int64)
+    offset = 0
+
+    for chunk in pd.read_csv(csv_path, usecols=sensors, chunksize=chunksize):
+        values = chunk[sensors].to_numpy(dtype=float)
+        mins = np.fmin(mins, np.nanmin(values, axis=0, initial=np.inf))
+        maxs = np.fmax(maxs, np.nanmax(values, axis=0, initial=-np.inf))
+
+        keys = rng.random(len(values))
+        sample_rows = np.concatenate([sample_rows, values])
+        sample_keys = np.concatenate([sample_keys, keys])
+        sample_pos = np.concatenate([sample_pos, offset + np.arange(len(values))])
+        if len(sample_keys) > sample_size:
+            keep = np.argpartition(sample_keys, sample_size)[:sample_size]
+            sample_rows, sample_keys, sample_pos = sample_rows[keep], sample_keys[keep], sample_pos[keep]
+        offset += len(values)
+
+    order = np.argsort(sample_pos)
+    ranges = {sensor: (float(mins[i]), float(maxs[i])) for i, sensor in enumerate(sensors)}
+    return ranges, pd.DataFrame(sample_rows[order], columns=sensors)
+
+
+def count_rules_from_csv(csv_path, fuzzy_sets, sensors, label_column, chunksize=DEFAULT_CHUNK_SIZE,
+                         counts=None):
+    """
+    Accumulates rule co-occurrence counts over a CSV, one chunk at a time.
+
+    The returned Counter is the mergeable rule statistics: counts from several files or
+    shards can be combined with Counter.update (in data order) before rules_from_counts.
+
+    Args:
+        csv_path (str): Path of the CSV file.
+        fuzzy_sets (dict): Fuzzy set data per sensor, as returned by auto_partition.
+        sensors (list of str): Sensor columns used in rule antecedents.
+        label_column (str): Column holding the fault label.
+        chunksize (int, optional): Rows read per chunk. Defaults to DEFAULT_CHUNK_SIZE.
+        counts (Counter, optional): Existing counts to add to.
+
+    Returns:
+        Counter: (rule_key, label) -> number of rows, see count_rule_pairs.
+    """
+    if counts is None:
+        counts = Counter()
+    for chunk in pd.read_csv(csv_path, usecols=list(sensors) + [label_column], chunksize=chunksize):
+        columns = {sensor: chunk[sensor].to_numpy(dtype=float) for sensor in sensors}
+        count_rule_pairs(columns, chunk[label_column].to_numpy(), fuzzy_sets, counts=counts)
+    return counts
+
+
+def train_from_csv(csv_path, sensors, label_column, chunksize=DEFAULT_CHUNK_SIZE,
+                   sample_size=DEFAULT_SAMPLE_SIZE, random_state=42, **partition_kwargs):
+    """
+    Trains fuzzy sets and rules from a CSV without loading it into memory.
+
+    Pass 1 finds each sensor's range and a bounded sample used to fit auto_partition;
+    pass 2 counts rule co-occurrences chunk by chunk. Peak memory is bounded by chunksize
+    and sample_size, not by the length of the file. If the whole file fits in the sample,
+    the result equals auto_partition + generate_rules on the full DataFrame.
+
+    Args:
+        csv_path (str): Path of the CSV file.
+        sensors (list of str): Sensor columns to partition and use in rules.
+        label_column (str): Column holding the fault label.
+        chunksize (int, optional): Rows read per chunk. Defaults to DEFAULT_CHUNK_SIZE.
+        sample_size (int, optional): Rows kept for fitting the partitions. Defaults to DEFAULT_SAMPLE_SIZE.
+        random_state (int, optional): Seed for sampling and KMeans. Defaults to 42.
+        **partition_kwargs: Passed on to auto_partition (num_sets, set_names, ...).
+
+    Returns:
+        tuple: (fuzzy_sets, rules), as from auto_partition and generate_rules.
+    """
+    t_start = time.perf_counter()
+    ranges, sample = scan_sensor_ranges(csv_path, sensors, chunksize=chunksize,
+                                        sample_size=sample_size, random_state=random_state)
+    t_scanned = time.perf_counter()
+    fuzzy_sets = {s: auto_partition(sample[s], value_range=ranges[s], random_state=random_state,
+                                    **partition_kwargs)
+                  for s in sensors}
+    t_partitioned = time.perf_counter()
+    counts = count_rules_from_csv(csv_path, fuzzy_sets, sensors, label_column, chunksize=chunksize)
+    rules = rules_from_counts(counts)
+    if instrumentation.sinks:
+        instrumentation.emit('train_from_csv', rows=sum(counts.values()), rules=len(rules),
+                             scan_seconds=t_scanned - t_start, partition_seconds=t_partitioned - t_scanned,
+                             counting_seconds=time.perf_counter() - t_partitioned)
+    return fuzzy_sets, rules
+
+
+@contextmanager
+def shared_columns(df, sensors, label_column):
+    """
+    Copies sensor columns and label codes of a DataFrame into shared memory for workers.
+
+    The sensor values are one float64 (sensors x rows) block and the label codes one int64
+    block of length rows; workers open them with attach_columns. Labels are coded as
+    count_rule_pairs codes them, so None and mixed-type labels work as in serial training.
+    Both blocks are unlinked when the context exits.
+
+    Yields:
+        tuple: (values_name, labels_name, label_values, label_codes): the names of the two
+               blocks, the label of each code and the code of each row.
+    """
+    n_rows = len(df)
+    label_values, label_codes = _factorize(df[label_column].to_numpy())
+    shm = shared_memory.SharedMemory(create=True, size=max(8 * len(sensors) * n_rows, 1))
+    labels_shm = shared_memory.SharedMemory(create=True, size=max(8 * n_rows, 1))
+    try:
+        values = np.ndarray((len(sensors), n_rows), dtype=np.float64, buffer=shm.buf)
+        for i, sensor in enumerate(sensors):
+            values[i] = df[sensor].to_numpy(dtype=float)
+        np.ndarray((n_rows,), dtype=np.int64, buffer=labels_shm.buf)[:] = label_codes
+        del values
+        yield shm.name, labels_shm.name, label_values, label_codes
+    finally:
+        shm.close()
+        shm.unlink()
+        labels_shm.close()
+        labels_shm.unlink()
+
+
+def attach_columns(shm_name, shape, dtype):
+    """Opens a shared memory block created by shared_columns and views it as an array."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _partition_worker(shm_name, shape, i, random_state, partition_kwargs):
+    shm, values = attach_columns(shm_name, shape, np.float64)
+    try:
+        return auto_partition(pd.Series(values[i], copy=False), random_state=random_state, **partition_kwargs)
+    finally:
+        del values
+        shm.close()
+
+
+def _count_worker(shm_name, shape, labels_name, label_values, sensors, fuzzy_sets, start, stop):
+    shm, values = attach_columns(shm_name, shape, np.float64)
+    labels_shm, label_codes = attach_columns(labels_name, (shape[1],), np.int64)
+    try:
+        columns = {sensor: values[i, start:stop] for i, sensor in enumerate(sensors)}
+        labels = np.asarray(label_values, dtype=object)[label_codes[start:stop]]
+        return count_rule_pairs(columns, labels, fuzzy_sets)
+    finally:
+        del values, label_codes, columns
+        shm.close()
+        labels_shm.close()
+
+
+def train_parallel(df, sensors, label_column, n_workers=None, n_shards=None, random_state=42,
+                   **partition_kwargs):
+    """
+    Trains fuzzy sets and rules on a process pool.
+
+    Sensors are partitioned concurrently, one task per sensor, and rule counting is split
+    into contiguous row shards whose counts are merged in shard order. Workers read the
+    sensor columns and label codes from shared memory instead of receiving pickled
+    DataFrames. The result is identical to auto_partition + generate_rules run serially
+    with the same random_state.
+
+    Args:
+        df (pd.DataFrame): Training data with the sensor columns and label_column.
+        sensors (list of str): Sensor columns to partition and use in rules.
+        label_column (str): Column holding the fault label.
+        n_workers (int, optional): Number of worker processes. Defaults to os.cpu_count().
+        n_shards (int, optional): Number of row shards for rule counting. Defaults to n_workers.
+        random_state (int, optional): Random state for KMeans. Defaults to 42.
+        **partition_kwargs: Passed on to auto_partition (num_sets, set_names, ...).
+
+    Returns:
+        tuple: (fuzzy_sets, rules), as from auto_partition and generate_rules.
+    """
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    if n_shards is None:
+        n_shards = n_workers
+    n_rows = len(df)
+    shape = (len(sensors), n_rows)
+
+    with shared_columns(df, sensors, label_column) as (values_name, labels_name, label_values, _):
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            t_start = time.perf_counter()
+            partitions = [pool.submit(_partition_worker, values_name, shape, i, random_state, partition_kwargs)
+                          for i in range(len(sensors))]
+            fuzzy_sets = {sensor: future.result() for sensor, future in zip(sensors, partitions)}
+            t_partitioned = time.perf_counter()
+
+            bounds = np.linspace(0, n_rows, max(1, min(n_shards, n_rows)) + 1).astype(int)
+            shards = [pool.submit(_count_worker, values_name, shape, labels_name, label_values,
+                                  sensors, fuzzy_sets, start, stop)
+                      for start, stop in zip(bounds[:-1], bounds[1:])]
+            counts = Counter()
+            for future in shards: # shard order keeps the serial first-occurrence order of the rules
+                counts.update(future.result())
+    rules = rules_from_counts(counts)
+    if instrumentation.sinks:
+        instrumentation.emit('train_parallel', rows=n_rows, rules=len(rules),
+                             partition_seconds=t_partitioned - t_start,
+                             counting_seconds=time.perf_counter() - t_partitioned)
+    return fuzzy_sets, rules
@@ -1,7 +1,20 @@
 import matplotlib.pyplot as plt
 import numpy as np
 import math
-import skfuzzy.fuzzymath.fuzzy_ops as fuzzy_ops
+from fuzzy.membership import is_analytic, membership, region_names
+
+def mf_curve(sensor_partition_data, set_name):
+    """
+    Points (x, y) that draw one membership function exactly.
+
+    A triangle only needs its breakpoints (plus the universe bounds), so analytic MFs are
+    drawn from 5 points instead of a sampled array; sampled MFs are returned as-is.
+    """
+    if is_analytic(sensor_partition_data):
+        lo, hi = sensor_partition_data['bounds']
+        a, b, c = sensor_partition_data['trimf'][set_name]
+        return np.array([min(lo, a), a, b, c, max(hi, c)]), np.array([0.0, 0.0, 1.0, 0.0, 0.0])
+    return sensor_partition_data['universe'], sensor_partition_data[set_name]
 
 def plot_fuzzy_sets_for_sensor(sensor_name, sensor_partition_data, ax=None, show_legend=True):
     """
@@ -11,14 +24,20 @@ def plot_fuzzy_sets_for_sensor(sensor_name, sensor_partition_data, ax=None, show
         fig, ax = plt.subplots(figsize=(8, 5))
         # Not showing plot here, caller should handle it or it's part of a larger figure.
 
+    analytic = is_analytic(sensor_partition_data)
     universe = sensor_partition_data.get('universe')
-    if universe is None or len(universe) == 0:
+    if not analytic and (universe is None or len(universe) == 0):
         ax.text(0.5, 0.5, 'No universe data to plot', horizontalalignment='center', verticalalignment='center', transform=ax.transAxes)
         ax.set_title(f'Fuzzy Sets for {sensor_name} (No Universe)')
         return ax
 
     mf_plotted = False
-    for set_name, mf_values in sensor_partition_data.items():
+    if analytic:
+        # triangles are drawn from their breakpoints, see mf_curve
+        for set_name in region_names(sensor_partition_data):
+            ax.plot(*mf_curve(sensor_partition_data, set_name), label=set_name)
+            mf_plotted = True
+    for set_name, mf_values in ({} if analytic else sensor_partition_data).items():
         if set_name == 'universe':
             continue
         if mf_values is not None and len(mf_values) == len(universe):
@@ -35,14 +54,17 @@ def plot_fuzzy_sets_for_sensor(sensor_name, sensor_partition_data, ax=None, show
         ax.legend()
     ax.grid(True)
     
-    if not mf_plotted and (universe is not None and len(universe) > 0):
+    if not mf_plotted:
         ax.text(0.5, 0.5, 'No valid MFs to plot', horizontalalignment='center', verticalalignment='center', transform=ax.transAxes)
 
     return ax
 
-def plot_all_sensor_partitions(all_fuzzy_sets, sensors_to_plot=None, figsize_per_plot=(6, 4), max_cols=3):
+def plot_all_sensor_partitions(all_fuzzy_sets, sensors_to_plot=None, figsize_per_plot=(6, 4), max_cols=3, show=True):
     """
     Plots the fuzzy set partitions for multiple sensors in a grid.
+
+    With show=False the figure is returned without calling plt.show(), e.g. to save it
+    with fig.savefig(...) on a headless server; close it with plt.close(fig) when done.
     """
     if not all_fuzzy_sets:
         print("No fuzzy sets data provided for plotting.")
@@ -88,14 +110,20 @@ def plot_all_sensor_partitions(all_fuzzy_sets, sensors_to_plot=None, figsize_per
     for j in range(num_sensors, len(axes_flat)):
         fig.delaxes(axes_flat[j])
 
-    plt.tight_layout()
-    plt.suptitle("Fuzzy Set Partitions for Sensors", fontsize=16, y=1.02)
-    plt.show()
+    fig.tight_layout()
+    fig.suptitle("Fuzzy Set Partitions for Sensors", fontsize=16, y=1.02)
+    if show:
+        plt.show()
+    return fig
 
 def plot_input_membership_for_rule_antecedent(test_reading, all_fuzzy_sets, rule_info,
-                                              figsize_per_plot=(7, 4), max_cols=3):
+                                              figsize_per_plot=(7, 4), max_cols=3, show=True):
     """
     Visualizes how a test reading activates the antecedent of a specific rule.
+
+    With show=False the figure is returned without calling plt.show(). To render many
+    readings to files, use fuzzy.report.render_activation_reports instead, which reuses
+    one figure.
     """
     if not rule_info or 'antecedent' not in rule_info or not rule_info['antecedent']:
         print("Rule information is missing or has no antecedents to visualize.")
@@ -147,16 +175,12 @@ def plot_input_membership_for_rule_antecedent(test_reading, all_fuzzy_sets, rule
         
         ax.axvline(sensor_value, color='r', linestyle='--', label=f'Test Value: {sensor_value:.2f}')
 
-        if target_region_name in sensor_partitions and \
-           sensor_partitions.get('universe') is not None and \
-           target_region_name in sensor_partitions and \
-           sensor_partitions.get(target_region_name) is not None:
+        if target_region_name in region_names(sensor_partitions):
             
-            mf_universe = sensor_partitions['universe']
-            mf_values = sensor_partitions[target_region_name]
+            mf_universe, mf_values = mf_curve(sensor_partitions, target_region_name)
             
             if len(mf_universe) == len(mf_values):
-                membership_degree = fuzzy_ops.interp_membership(mf_universe, mf_values, sensor_value)
+                membership_degree = membership(all_fuzzy_sets[sensor_name], target_region_name, sensor_value)
                 ax.plot(mf_universe, mf_values, color='k', linewidth=2.5, label=f'{target_region_name} (Rule)')
                 ax.fill_between(mf_universe, mf_values, alpha=0.2, color='k')
                 ax.plot(sensor_value, membership_degree, 'ro', markersize=8)
@@ -172,5 +196,7 @@ def plot_input_membership_for_rule_antecedent(test_reading, all_fuzzy_sets, rule
     for j in range(num_sensors, len(axes_flat)):
         fig.delaxes(axes_flat[j])
 
-    plt.tight_layout(rect=[0, 0, 1, 0.96])
-    plt.show()
+    fig.tight_layout(rect=[0, 0, 1, 0.96])
+    if show:
+        plt.show()
+    return fig
@@ -2,6 +2,8 @@ import pandas as pd
 from fuzzy.partition import auto_partition
 from fuzzy.rule_generator import generate_rules
 from fuzzy.inference_engine import diagnose
+from fuzzy.rule_compiler import compile_rules
+from fuzzy.evaluation import cross_validate
 from fuzzy.visualization import plot_all_sensor_partitions, plot_input_membership_for_rule_antecedent
 import matplotlib.pyplot as plt
 
@@ -27,7 +29,7 @@ plot_all_sensor_partitions(fuzzy_sets, sensors_to_plot=sensors)
 plt.show() # Ensure plots are displayed
 
 # 4. Generate rules and run one demo inference
-rules = generate_rules(data, fuzzy_sets)
+rules = generate_rules(df, fuzzy_sets, label_column=fault_column, sensors=sensors)
 print(f"\nGenerated {len(rules)} rules. Top 5 rules:")
 for i, rule in enumerate(rules[:5]):
     print(f"Rule {i+1}: IF {rule['antecedent']} THEN {rule['consequent']} (Conf: {rule['confidence']:.2f}, Supp: {rule['support']:.2f})")
@@ -38,11 +40,12 @@ actual_fault = df[fault_column].iloc[0]
 print(f"Actual fault for test reading: {actual_fault}")
 
 print("\nDiagnosing fault...")
-diagnosis_result = diagnose(test_reading, fuzzy_sets, rules)
+compiled_rules = compile_rules(rules, fuzzy_sets)
+diagnosis_result = diagnose(test_reading, fuzzy_sets, compiled_rules)
 diagnosed_fault = diagnosis_result['diagnosed_consequent']
 activated_rule_info = diagnosis_result['activated_rule_info']
 
-print(f"Diagnosed fault: {diagnosed_fault}")
+print(f"Diagnosed fault: {diagnosed_fault} (status: {diagnosis_result['status']})")
 
 # Visualize the activation of the best rule found
 if activated_rule_info:
@@ -53,3 +56,9 @@ if activated_rule_info:
     plt.show() # Ensure plot is displayed
 else:
     print("\nNo rule information available to visualize for activation.")
+
+# 5. Cross-validate the whole pipeline over a grid of thresholds
+cv = cross_validate(df, sensors, fault_column, n_folds=5, n_workers=1) # in-process: this script has no __main__ guard
+print("\n5-fold cross-validation:")
+for threshold, accuracy, coverage in zip(cv['thresholds'][::4], cv['accuracy'][::4], cv['coverage'][::4]):
+    print(f"threshold {threshold:.2f}: accuracy {accuracy:.3f}, coverage {coverage:.3f}")